@@ -1,7 +1,28 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from datetime import timedelta
+from flask import Flask, render_template, request, redirect, url_for, session, flash, abort, Response, jsonify, send_file, send_from_directory, stream_template
+from werkzeug.http import parse_content_range_header
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+from datetime import date, datetime, timedelta, timezone
+import calendar
+import hashlib
+import gzip
+import heapq
+import hmac
+import json
+import mimetypes
+import queue
+import secrets
+import shutil
 import sqlite3
+import threading
+import time
 import os
+import zlib
+
+try:
+    import brotli  # Optional: enables Content-Encoding: br
+except ImportError:
+    brotli = None
 
 # ----------------------------------------
 # Flask App Configuration
@@ -11,6 +32,12 @@ app.secret_key = 'your_secret_key'  # Secret key for session management and flas
 app.permanent_session_lifetime = timedelta(days=7)  # Sessions last 7 days
 
 DATABASE = "site.db"  # SQLite database file storing all app data
+UPLOAD_FOLDER = "uploads"  # Content-addressed homework files and in-progress uploads
+ARCHIVE_FOLDER = "archive"  # Compressed, read-only archives of past terms (see Archive)
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # Largest homework file accepted, in bytes
+
+# Reject larger request bodies outright (allowing for multipart form overhead)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_SIZE + 1024 * 1024
 
 # ----------------------------------------
 # Database Class
@@ -25,13 +52,31 @@ class Database:
     - dashboard: stores dashboard data for each user
     - weekly_schedule: stores weekly schedule per user
     - invoices: stores invoice information
+    - calendar_feeds: stores each user's iCalendar feed token and cached output
+    - registration_subjects / registration_locations: inverted indexes used for matching
+    - tutor_matches: stores which tutor each student has been assigned to
+    - homework_files / homework_submissions / homework_uploads: homework storage (see HomeworkStore)
+    - archive_log: integrity report of every archival run (see Archive)
+    - events: recent change notifications shared by all workers (see EventBus)
     """
 
+    # Timestamp columns added to existing tables after they were first created
+    ADDED_COLUMNS = {
+        'dashboard': 'updated_at',
+        'weekly_schedule': 'updated_at',
+        'invoices': 'created_at',
+    }
+
     @staticmethod
     def connect():
         """Establish a connection to the SQLite database."""
         return sqlite3.connect(DATABASE)
 
+    @staticmethod
+    def timestamp():
+        """Current UTC time in the format stored in timestamp columns."""
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
     @staticmethod
     def init_db():
         """
@@ -79,7 +124,8 @@ class Database:
             registered_tutors TEXT,
             registered_students TEXT,
             dropout_tutors TEXT,
-            dropout_students TEXT
+            dropout_students TEXT,
+            updated_at TEXT
         )
         ''')
 
@@ -96,7 +142,8 @@ class Database:
             saturday TEXT,
             sunday TEXT,
             month TEXT,
-            week TEXT
+            week TEXT,
+            updated_at TEXT
         )
         ''')
 
@@ -116,13 +163,294 @@ class Database:
             total TEXT,
             payment_method TEXT,
             invoice_date TEXT,
-            username TEXT
+            username TEXT,
+            created_at TEXT
+        )
+        ''')
+
+        # Calendar feeds table: secret feed token plus the cached .ics output and its ETag
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS calendar_feeds (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL UNIQUE,
+            token TEXT NOT NULL UNIQUE,
+            ics TEXT,
+            etag TEXT,
+            updated_at TEXT
+        )
+        ''')
+
+        # Matching indexes: one row per (registration, subject) and (registration, location)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registration_subjects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            role TEXT,
+            subject TEXT NOT NULL
+        )
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registration_locations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            role TEXT,
+            location TEXT NOT NULL
+        )
+        ''')
+
+        # Tutor matches table: one assigned tutor per student
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tutor_matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_email TEXT NOT NULL UNIQUE,
+            tutor_email TEXT NOT NULL,
+            score REAL,
+            matched_at TEXT
+        )
+        ''')
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_registration_subjects ON registration_subjects (role, subject, email)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_registration_locations ON registration_locations (role, location, email)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_registration_subjects_email ON registration_subjects (email)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_registration_locations_email ON registration_locations (email)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tutor_matches_tutor ON tutor_matches (tutor_email)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_weekly_schedule_email ON weekly_schedule (email)")
+
+        # Homework files table: one row per stored file, keyed by its SHA-256
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS homework_files (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            created_at TEXT
+        )
+        ''')
+
+        # Homework submissions table: per-student metadata pointing at a stored file
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS homework_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            submitted_at TEXT
+        )
+        ''')
+
+        # Homework uploads table: resumable uploads still in progress
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS homework_uploads (
+            id TEXT PRIMARY KEY,
+            email TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            received INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_homework_submissions_email ON homework_submissions (email)")
+
+        # Archive log table: one row per table moved by an archival run
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            boundary TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            archive_file TEXT NOT NULL,
+            rows_selected INTEGER,
+            rows_archived INTEGER,
+            rows_deleted INTEGER,
+            rows_verified INTEGER,
+            created_at TEXT
+        )
+        ''')
+
+        # Events table: change notifications, polled by every worker's EventBus
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            email TEXT,
+            payload TEXT,
+            created_at TEXT
         )
         ''')
 
+        # Add timestamp columns to tables created before they existed
+        for table, column in Database.ADDED_COLUMNS.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            if column not in [row[1] for row in cursor.fetchall()]:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+                cursor.execute(f"UPDATE {table} SET {column}=?", (Database.timestamp(),))
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_dashboard_email ON dashboard (email)")
+
+        # Build the matching indexes for registrations saved before they existed
+        cursor.execute("SELECT COUNT(*) FROM registration_subjects")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT email, role, subjects, locations FROM registrations")
+            for email, role, subjects, locations in cursor.fetchall():
+                TutorMatcher.index_registration(cursor, email, role, (subjects or '').split(','),
+                                                (locations or '').split(','))
+
         conn.commit()
         conn.close()
 
+# ----------------------------------------
+# EventBus Class
+# ----------------------------------------
+class EventBus:
+    """
+    Change notifications pushed to open pages over Server-Sent Events.
+
+    Writers publish into the events table inside their own transaction,
+    so an event is only visible once the change is committed. The events
+    table stands in for cross-worker pub/sub: each worker runs a single
+    poller thread that reads new events and fans them out to the queues
+    of its local subscribers, so the database is polled once per worker
+    however many pages are open. Idle connections just block on their
+    queue and send a heartbeat comment every HEARTBEAT seconds.
+    """
+
+    POLL_INTERVAL = 1.0  # Seconds between polls of the events table
+    HEARTBEAT = 15.0  # Seconds between keep-alive comments on idle streams
+    QUEUE_SIZE = 256  # Events buffered per subscriber before it is dropped
+    RETENTION = 1000  # Events kept for clients resuming with Last-Event-ID
+
+    _subscribers = set()
+    _lock = threading.Lock()
+    _thread = None
+
+    @staticmethod
+    def publish(cursor, topic, email, payload):
+        """Record an event using the caller's cursor (same transaction as the change)."""
+        cursor.execute("INSERT INTO events (topic, email, payload, created_at) VALUES (?, ?, ?, ?)",
+                       (topic, email, json.dumps(payload), Database.timestamp()))
+        cursor.execute("DELETE FROM events WHERE id <= ?", (cursor.lastrowid - EventBus.RETENTION,))
+
+    @staticmethod
+    def publish_rows(cursor, table, email, row_id=None):
+        """Publish the current contents of a table row (by id, or every row for the email)."""
+        if row_id is None:
+            cursor.execute(f"SELECT * FROM {table} WHERE email=?", (email,))
+        else:
+            cursor.execute(f"SELECT * FROM {table} WHERE id=?", (row_id,))
+        for row in cursor.fetchall():
+            EventBus.publish(cursor, table, email, {'id': row[0], 'row': list(row)})
+
+    @staticmethod
+    def since(last_id):
+        """Events after last_id still in the events table, oldest first."""
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, topic, email, payload FROM events WHERE id > ? ORDER BY id", (last_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{'id': r[0], 'topic': r[1], 'email': r[2], 'payload': r[3]} for r in rows]
+
+    @staticmethod
+    def subscribe():
+        """Register a local subscriber queue, starting this worker's poller if needed."""
+        subscriber = queue.Queue(maxsize=EventBus.QUEUE_SIZE)
+        with EventBus._lock:
+            EventBus._subscribers.add(subscriber)
+            if EventBus._thread is None:
+                # Start from the newest event now, so nothing published after subscribing is missed
+                try:
+                    last_id = EventBus.latest_id()
+                except Exception:
+                    app.logger.exception("EventBus: could not read the latest event id")
+                    last_id = None
+                EventBus._thread = threading.Thread(target=EventBus._poll, args=(last_id,), daemon=True)
+                EventBus._thread.start()
+        return subscriber
+
+    @staticmethod
+    def unsubscribe(subscriber):
+        """Remove a subscriber queue."""
+        with EventBus._lock:
+            EventBus._subscribers.discard(subscriber)
+
+    @staticmethod
+    def is_subscribed(subscriber):
+        """False once a subscriber has been dropped for falling too far behind."""
+        with EventBus._lock:
+            return subscriber in EventBus._subscribers
+
+    @staticmethod
+    def latest_id():
+        """Id of the newest event, or 0."""
+        conn = Database.connect()
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        conn.close()
+        return last_id
+
+    @staticmethod
+    def _poll(last_id):
+        """
+        Poller thread: fan events after last_id out to local subscribers until none are left.
+        Database errors (e.g. locked during an archival VACUUM) are logged and the
+        poll is retried, so one bad read never silences every stream in the worker.
+        """
+        try:
+            while True:
+                with EventBus._lock:
+                    if not EventBus._subscribers:
+                        EventBus._thread = None
+                        return
+                time.sleep(EventBus.POLL_INTERVAL)
+                try:
+                    if last_id is None:
+                        last_id = EventBus.latest_id()
+                        continue
+                    events = EventBus.since(last_id)
+                except Exception:
+                    app.logger.exception("EventBus: polling the events table failed, retrying")
+                    continue
+                if not events:
+                    continue
+                last_id = events[-1]['id']
+                with EventBus._lock:
+                    for subscriber in list(EventBus._subscribers):
+                        try:
+                            for event in events:
+                                subscriber.put_nowait(event)
+                        except queue.Full:
+                            # Too slow: drop it, the client reconnects and resumes with Last-Event-ID
+                            EventBus._subscribers.discard(subscriber)
+        finally:
+            # If the thread dies anyway, let the next subscribe() start a new poller
+            with EventBus._lock:
+                if EventBus._thread is threading.current_thread():
+                    EventBus._thread = None
+
+    @staticmethod
+    def stream(subscriber, last_id, email=None):
+        """
+        Generate the Server-Sent Events body for one connection.
+        Only events for the given email are sent, unless email is None.
+        """
+        try:
+            yield f"retry: {int(EventBus.POLL_INTERVAL * 3000)}\n\n"
+            backlog = EventBus.since(last_id) if last_id else []
+            while True:
+                if backlog:
+                    event = backlog.pop(0)
+                else:
+                    try:
+                        event = subscriber.get(timeout=EventBus.HEARTBEAT)
+                    except queue.Empty:
+                        if not EventBus.is_subscribed(subscriber):
+                            return
+                        yield ": keep-alive\n\n"
+                        continue
+                if event['id'] <= last_id or (email is not None and event['email'] != email):
+                    continue
+                last_id = event['id']
+                yield f"id: {event['id']}\nevent: {event['topic']}\ndata: {event['payload']}\n\n"
+        finally:
+            EventBus.unsubscribe(subscriber)
+
 # ----------------------------------------
 # User Class
 # ----------------------------------------
@@ -208,21 +536,227 @@ class Registration:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (self.fullname, self.email, self.dob_day, self.dob_month, self.dob_year,
               self.gender, self.role, self.subjects, self.locations))
+        EventBus.publish_rows(cursor, 'registrations', self.email, cursor.lastrowid)
+
+        TutorMatcher.index_registration(cursor, self.email, self.role,
+                                        self.subjects.split(','), self.locations.split(','))
 
         cursor.execute('''
             INSERT INTO dashboard (email, homework_assigned, homework_submitted, attendance_students,
                                    attendance_tutor, registered_tutors, registered_students,
-                                   dropout_tutors, dropout_students)
-            VALUES (?, '', '', '', '', '', '', '', '')
-        ''', (self.email,))
+                                   dropout_tutors, dropout_students, updated_at)
+            VALUES (?, '', '', '', '', '', '', '', '', ?)
+        ''', (self.email, Database.timestamp()))
+        EventBus.publish_rows(cursor, 'dashboard', self.email, cursor.lastrowid)
+
+        cursor.execute('''
+            INSERT INTO weekly_schedule (email, monday, tuesday, wednesday, thursday, friday, saturday, sunday, month, week, updated_at)
+            VALUES (?, '', '', '', '', '', '', '', '', '', ?)
+        ''', (self.email, Database.timestamp()))
+        EventBus.publish_rows(cursor, 'weekly_schedule', self.email, cursor.lastrowid)
+
+        conn.commit()
+        conn.close()
+
+# ----------------------------------------
+# TutorMatcher Class
+# ----------------------------------------
+class TutorMatcher:
+    """
+    Matches students to compatible tutors.
+
+    Registration.save keeps two inverted indexes up to date
+    (registration_subjects and registration_locations), so candidates are
+    found with indexed lookups instead of splitting every registration.
+
+    Candidates must share at least one subject and one location with the
+    student, and are ranked by:
+        SUBJECT_WEIGHT * shared subjects
+      + LOCATION_WEIGHT * shared locations
+      + AVAILABILITY_WEIGHT * free days in the tutor's weekly schedule
+      - LOAD_PENALTY * students already assigned to the tutor
+    """
 
+    SUBJECT_WEIGHT = 3.0
+    LOCATION_WEIGHT = 2.0
+    AVAILABILITY_WEIGHT = 0.5
+    LOAD_PENALTY = 1.0
+
+    FREE_DAYS_SQL = " + ".join(f"(COALESCE(w.{day}, '') = '')" for day in
+                               ['monday','tuesday','wednesday','thursday','friday','saturday','sunday'])
+
+    @staticmethod
+    def index_registration(cursor, email, role, subjects, locations):
+        """Add a registration's subjects and locations to the inverted indexes."""
+        cursor.executemany("INSERT INTO registration_subjects (email, role, subject) VALUES (?, ?, ?)",
+                           [(email, role, s.strip()) for s in set(subjects) if s.strip()])
+        cursor.executemany("INSERT INTO registration_locations (email, role, location) VALUES (?, ?, ?)",
+                           [(email, role, l.strip()) for l in set(locations) if l.strip()])
+
+    @staticmethod
+    def score(subject_overlap, location_overlap, free_days, load):
+        """Ranking score for a tutor candidate (higher is better)."""
+        return (TutorMatcher.SUBJECT_WEIGHT * subject_overlap
+                + TutorMatcher.LOCATION_WEIGHT * location_overlap
+                + TutorMatcher.AVAILABILITY_WEIGHT * free_days
+                - TutorMatcher.LOAD_PENALTY * load)
+
+    @staticmethod
+    def rank(student_email, limit=10):
+        """
+        Rank compatible tutors for a single student.
+        The student's own current match is not counted in a tutor's load,
+        so re-ranking an already matched student compares tutors fairly.
+
+        Returns:
+            list of dicts (tutor, subject_overlap, location_overlap, free_days, load, score), best first
+        """
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT subject FROM registration_subjects WHERE email=? AND role='Student'", (student_email,))
+        subjects = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT DISTINCT location FROM registration_locations WHERE email=? AND role='Student'", (student_email,))
+        locations = [row[0] for row in cursor.fetchall()]
+        if not subjects or not locations:
+            conn.close()
+            return []
+
+        cursor.execute(f'''
+            WITH subject_hits AS (
+                SELECT email, COUNT(DISTINCT subject) AS n FROM registration_subjects
+                WHERE role = 'Tutor' AND subject IN ({','.join('?' * len(subjects))})
+                GROUP BY email
+            ), location_hits AS (
+                SELECT email, COUNT(DISTINCT location) AS n FROM registration_locations
+                WHERE role = 'Tutor' AND location IN ({','.join('?' * len(locations))})
+                GROUP BY email
+            )
+            SELECT s.email, s.n, l.n,
+                   COALESCE((SELECT {TutorMatcher.FREE_DAYS_SQL} FROM weekly_schedule w WHERE w.email = s.email LIMIT 1), 7),
+                   (SELECT COUNT(*) FROM tutor_matches m WHERE m.tutor_email = s.email AND m.student_email != ?)
+            FROM subject_hits s JOIN location_hits l ON l.email = s.email
+        ''', (*subjects, *locations, student_email))
+        rows = cursor.fetchall()
+        conn.close()
+
+        candidates = [{
+            'tutor': email,
+            'subject_overlap': subject_overlap,
+            'location_overlap': location_overlap,
+            'free_days': free_days,
+            'load': load,
+            'score': TutorMatcher.score(subject_overlap, location_overlap, free_days, load),
+        } for email, subject_overlap, location_overlap, free_days, load in rows]
+        candidates.sort(key=lambda c: (-c['score'], c['tutor']))
+        return candidates[:limit]
+
+    @staticmethod
+    def is_tutor(email):
+        """Return True if the user is registered as a tutor."""
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM registrations WHERE email=? AND role='Tutor' LIMIT 1", (email,))
+        row = cursor.fetchone()
+        conn.close()
+        return row is not None
+
+    @staticmethod
+    def assign(student_email):
+        """Assign the best-ranked tutor to a student. Returns the match dict, or None if no tutor fits."""
+        candidates = TutorMatcher.rank(student_email, limit=1)
+        if not candidates:
+            return None
+        best = candidates[0]
+        conn = Database.connect()
+        cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO weekly_schedule (email, monday, tuesday, wednesday, thursday, friday, saturday, sunday, month, week)
-            VALUES (?, '', '', '', '', '', '', '', '', '')
-        ''', (self.email,))
+            INSERT OR REPLACE INTO tutor_matches (student_email, tutor_email, score, matched_at)
+            VALUES (?, ?, ?, ?)
+        ''', (student_email, best['tutor'], best['score'], Database.timestamp()))
+        conn.commit()
+        conn.close()
+        return best
+
+    @staticmethod
+    def assign_intake():
+        """
+        Assign every unmatched student to a tutor in one pass.
+
+        The indexes are read once into memory. Students with the same
+        subject/location combination share one heap of candidate tutors;
+        heap entries whose load has changed since they were pushed are
+        re-pushed with the current load, so loads stay exact across groups.
 
+        Returns:
+            number of students assigned
+        """
+        conn = Database.connect()
+        cursor = conn.cursor()
+
+        tutors_by_subject, tutors_by_location = {}, {}
+        tutor_subjects, tutor_locations = {}, {}
+        student_subjects, student_locations = {}, {}
+        cursor.execute("SELECT email, role, subject FROM registration_subjects WHERE role IN ('Tutor', 'Student')")
+        for email, role, subject in cursor:
+            if role == 'Tutor':
+                tutors_by_subject.setdefault(subject, set()).add(email)
+                tutor_subjects.setdefault(email, set()).add(subject)
+            else:
+                student_subjects.setdefault(email, set()).add(subject)
+        cursor.execute("SELECT email, role, location FROM registration_locations WHERE role IN ('Tutor', 'Student')")
+        for email, role, location in cursor:
+            if role == 'Tutor':
+                tutors_by_location.setdefault(location, set()).add(email)
+                tutor_locations.setdefault(email, set()).add(location)
+            else:
+                student_locations.setdefault(email, set()).add(location)
+
+        cursor.execute("SELECT tutor_email, COUNT(*) FROM tutor_matches GROUP BY tutor_email")
+        load = dict(cursor.fetchall())
+        cursor.execute("SELECT student_email FROM tutor_matches")
+        matched = {row[0] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT w.email, {TutorMatcher.FREE_DAYS_SQL} FROM weekly_schedule w")
+        free_days = dict(cursor.fetchall())
+
+        # Group unmatched students by their (subjects, locations) signature
+        groups = {}
+        for email, subjects in student_subjects.items():
+            if email in matched or email not in student_locations:
+                continue
+            groups.setdefault((frozenset(subjects), frozenset(student_locations[email])), []).append(email)
+
+        matched_at = Database.timestamp()
+        assignments = []
+        for (subjects, locations), students in groups.items():
+            by_subject = set().union(*(tutors_by_subject.get(s, ()) for s in subjects))
+            by_location = set().union(*(tutors_by_location.get(l, ()) for l in locations))
+            base = {}
+            for tutor in by_subject & by_location:
+                base[tutor] = TutorMatcher.score(len(subjects & tutor_subjects[tutor]),
+                                                 len(locations & tutor_locations[tutor]),
+                                                 free_days.get(tutor, 7), 0)
+            heap = [(-(b - TutorMatcher.LOAD_PENALTY * load.get(t, 0)), t, load.get(t, 0)) for t, b in base.items()]
+            heapq.heapify(heap)
+            for student in students:
+                while heap:
+                    neg_score, tutor, seen_load = heapq.heappop(heap)
+                    current = load.get(tutor, 0)
+                    if seen_load == current:
+                        break
+                    # Stale entry: the tutor was assigned elsewhere since it was pushed
+                    heapq.heappush(heap, (-(base[tutor] - TutorMatcher.LOAD_PENALTY * current), tutor, current))
+                else:
+                    break
+                assignments.append((student, tutor, -neg_score, matched_at))
+                load[tutor] = current + 1
+                heapq.heappush(heap, (-(base[tutor] - TutorMatcher.LOAD_PENALTY * load[tutor]), tutor, load[tutor]))
+
+        cursor.executemany('''
+            INSERT INTO tutor_matches (student_email, tutor_email, score, matched_at) VALUES (?, ?, ?, ?)
+        ''', assignments)
         conn.commit()
         conn.close()
+        return len(assignments)
 
 # ----------------------------------------
 # Dashboard Class
@@ -250,12 +784,22 @@ class Dashboard:
         return {Dashboard.FIELDS[i]: row[i] if row else '' for i in range(len(Dashboard.FIELDS))}
 
     def update_data(self, data_dict):
-        """Update dashboard data based on user input."""
+        """
+        Update dashboard data based on user input.
+        Recreates the row if it was moved to a term archive.
+        """
+        values = (*[data_dict[f] for f in Dashboard.FIELDS], Database.timestamp())
         conn = Database.connect()
         cursor = conn.cursor()
         cursor.execute(f'''
-            UPDATE dashboard SET {','.join([f"{f}=?" for f in Dashboard.FIELDS])} WHERE email=?
-        ''', (*[data_dict[f] for f in Dashboard.FIELDS], self.email))
+            UPDATE dashboard SET {','.join([f"{f}=?" for f in Dashboard.FIELDS])}, updated_at=? WHERE email=?
+        ''', (*values, self.email))
+        if cursor.rowcount == 0:
+            cursor.execute(f'''
+                INSERT INTO dashboard ({','.join(Dashboard.FIELDS)}, updated_at, email)
+                VALUES ({','.join('?' * (len(Dashboard.FIELDS) + 2))})
+            ''', (*values, self.email))
+        EventBus.publish_rows(cursor, 'dashboard', self.email)
         conn.commit()
         conn.close()
 
@@ -284,14 +828,183 @@ class WeeklySchedule:
         return {day: '' for day in WeeklySchedule.DAYS} | {'month': '', 'week': ''}
 
     def update_data(self, schedule_dict):
-        """Update weekly schedule data in database."""
+        """
+        Update weekly schedule data in database.
+        The user's calendar feed is only regenerated when the row actually changes.
+        Recreates the row if it was moved to a term archive.
+        """
+        values = (*[schedule_dict[day] for day in WeeklySchedule.DAYS], schedule_dict['month'], schedule_dict['week'])
+        conn = Database.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {','.join(WeeklySchedule.DAYS)}, month, week FROM weekly_schedule WHERE email=?", (self.email,))
+            old_row = cursor.fetchone()
+            if old_row is None:
+                cursor.execute(f'''
+                    INSERT INTO weekly_schedule ({','.join(WeeklySchedule.DAYS)}, month, week, updated_at, email)
+                    VALUES ({','.join('?' * (len(WeeklySchedule.DAYS) + 4))})
+                ''', (*values, Database.timestamp(), self.email))
+            else:
+                cursor.execute(f'''
+                    UPDATE weekly_schedule SET {','.join([f"{day}=?" for day in WeeklySchedule.DAYS])}, month=?, week=?, updated_at=?
+                    WHERE email=?
+                ''', (*values, Database.timestamp(), self.email))
+            if old_row is None or tuple(str(v) for v in old_row) != tuple(str(v) for v in values):
+                CalendarFeed.regenerate(cursor, self.email, dict(zip(WeeklySchedule.DAYS + ['month', 'week'], values)))
+                EventBus.publish_rows(cursor, 'weekly_schedule', self.email)
+            conn.commit()
+        finally:
+            conn.close()
+
+# ----------------------------------------
+# CalendarFeed Class
+# ----------------------------------------
+class CalendarFeed:
+    """
+    Subscribable iCalendar (.ics) feed of a user's weekly schedule.
+
+    Each user gets an unguessable token. The serialized feed and a strong ETag
+    are cached in the calendar_feeds table, so polling calendar clients only
+    cost a single indexed lookup (or a 304) until the schedule changes.
+    """
+
+    MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+    MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+
+    def __init__(self, email):
+        self.email = email
+
+    def get_token(self):
+        """Return the user's feed token, creating one on first use."""
         conn = Database.connect()
         cursor = conn.cursor()
-        cursor.execute(f'''
-            UPDATE weekly_schedule SET {','.join([f"{day}=?" for day in WeeklySchedule.DAYS])}, month=?, week=? WHERE email=?
-        ''', (*[schedule_dict[day] for day in WeeklySchedule.DAYS], schedule_dict['month'], schedule_dict['week'], self.email))
+        cursor.execute("SELECT token FROM calendar_feeds WHERE email=?", (self.email,))
+        row = cursor.fetchone()
+        if row:
+            conn.close()
+            return row[0]
+        token = secrets.token_urlsafe(32)
+        cursor.execute("INSERT INTO calendar_feeds (email, token) VALUES (?, ?)", (self.email, token))
         conn.commit()
         conn.close()
+        return token
+
+    @staticmethod
+    def get_by_token(token):
+        """
+        Retrieve the cached feed for a token, generating it if it was never built.
+
+        Returns:
+            tuple(ics, etag) if the token exists, else None
+        """
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT email, ics, etag FROM calendar_feeds WHERE token=?", (token,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        email, ics, etag = row
+        if ics is None:
+            ics, etag = CalendarFeed.regenerate(cursor, email, WeeklySchedule(email).get_data())
+            conn.commit()
+        conn.close()
+        return ics, etag
+
+    @staticmethod
+    def regenerate(cursor, email, schedule):
+        """
+        Rebuild and cache the feed for a user (only if they have subscribed).
+        Uses the caller's cursor so the cache is written in the same transaction as the schedule.
+
+        Returns:
+            tuple(ics, etag), or None if the user has no feed
+        """
+        cursor.execute("SELECT 1 FROM calendar_feeds WHERE email=?", (email,))
+        if cursor.fetchone() is None:
+            return None
+        ics = CalendarFeed.build_ics(email, schedule)
+        etag = hashlib.sha256(ics.encode('utf-8')).hexdigest()
+        cursor.execute("UPDATE calendar_feeds SET ics=?, etag=?, updated_at=? WHERE email=?",
+                       (ics, etag, Database.timestamp(), email))
+        return ics, etag
+
+    @staticmethod
+    def week_start(month, week):
+        """
+        Resolve the schedule's month (1-12 or Jan-Dec) and week number (1-10)
+        to the Monday of that week in the current year.
+        Weeks above 10 are clamped to 10; anything else that cannot be parsed
+        falls back to the current week.
+        """
+        today = date.today()
+        month = str(month).strip().lower()
+        try:
+            month_no = int(month)
+        except ValueError:
+            month_no = CalendarFeed.MONTHS.get(month)
+        try:
+            week_no = min(int(week), 10)
+        except (TypeError, ValueError):
+            week_no = 0
+        if not month_no or not 1 <= month_no <= 12 or week_no < 1:
+            return today - timedelta(days=today.weekday())
+        first = date(today.year, month_no, 1)
+        first_monday = first + timedelta(days=(7 - first.weekday()) % 7)
+        return first_monday + timedelta(weeks=week_no - 1)
+
+    @staticmethod
+    def escape(text):
+        """Escape a value for use in an iCalendar TEXT property."""
+        return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+                .replace(',', '\\,').replace('\n', '\\n'))
+
+    @staticmethod
+    def fold(line):
+        """Fold a content line at 75 octets as required by RFC 5545."""
+        data = line.encode('utf-8')
+        if len(data) <= 75:
+            return line
+        parts = []
+        while len(data) > 75:
+            cut = 75 if not parts else 74
+            # Never split a multi-byte UTF-8 character
+            while cut > 0 and (data[cut] & 0xC0) == 0x80:
+                cut -= 1
+            parts.append(data[:cut].decode('utf-8'))
+            data = data[cut:]
+        parts.append(data.decode('utf-8'))
+        return '\r\n '.join(parts)
+
+    @staticmethod
+    def build_ics(email, schedule):
+        """Serialize a weekly schedule dictionary into an iCalendar document."""
+        start = CalendarFeed.week_start(schedule.get('month', ''), schedule.get('week', ''))
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        uid_base = hashlib.sha256(email.encode('utf-8')).hexdigest()[:16]
+        lines = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//sySTEM@TECH//Weekly Schedule//EN',
+            'CALSCALE:GREGORIAN',
+            'X-WR-CALNAME:sySTEM@TECH Weekly Schedule',
+        ]
+        for i, day in enumerate(WeeklySchedule.DAYS):
+            summary = str(schedule.get(day) or '').strip()
+            if not summary:
+                continue
+            day_date = start + timedelta(days=i)
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:{uid_base}-{day}@systemtech',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART;VALUE=DATE:{day_date.strftime("%Y%m%d")}',
+                f'DTEND;VALUE=DATE:{(day_date + timedelta(days=1)).strftime("%Y%m%d")}',
+                f'SUMMARY:{CalendarFeed.escape(summary)}',
+                'END:VEVENT',
+            ]
+        lines.append('END:VCALENDAR')
+        return '\r\n'.join(CalendarFeed.fold(line) for line in lines) + '\r\n'
 
 # ----------------------------------------
 # Invoice Class
@@ -323,22 +1036,747 @@ class Invoice:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO invoices (invoice_no, due_date, client_name, client_email, company_name,
-                                  company_address, items, subtotal, tax, total, payment_method, invoice_date, username)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                  company_address, items, subtotal, tax, total, payment_method, invoice_date, username, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (self.invoice_no, self.due_date, self.client_name, self.client_email, self.company_name,
-              self.company_address, self.items, self.subtotal, self.tax, self.total, self.payment_method, self.invoice_date, self.username))
+              self.company_address, self.items, self.subtotal, self.tax, self.total, self.payment_method, self.invoice_date, self.username,
+              Database.timestamp()))
+        EventBus.publish_rows(cursor, 'invoices', self.username, cursor.lastrowid)
         conn.commit()
         conn.close()
 
+# ----------------------------------------
+# HomeworkStore Class
+# ----------------------------------------
+class HomeworkStore:
+    """
+    Stores homework submissions on disk.
+
+    Files are content-addressed by SHA-256 under UPLOAD_FOLDER/objects, so
+    identical files are stored once; each submission is a metadata row in
+    homework_submissions. Uploads are streamed to disk in CHUNK_SIZE pieces
+    and large files can be sent as resumable chunked uploads. Files larger
+    than MAX_UPLOAD_SIZE are rejected, and resumable uploads untouched for
+    STALE_AFTER are removed.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    STALE_AFTER = timedelta(days=1)
+
+    @staticmethod
+    def object_path(sha256):
+        """Path of a stored file, fanned out by the first two hex digits."""
+        return os.path.join(UPLOAD_FOLDER, 'objects', sha256[:2], sha256[2:])
+
+    @staticmethod
+    def partial_path(upload_id):
+        """Path of an in-progress resumable upload."""
+        return os.path.join(UPLOAD_FOLDER, 'partial', upload_id)
+
+    @staticmethod
+    def copy_stream(stream, f, limit=None):
+        """
+        Copy a stream into an open file in chunks, never reading it whole.
+
+        Returns:
+            number of bytes written
+        """
+        written = 0
+        while limit is None or written < limit:
+            size = HomeworkStore.CHUNK_SIZE if limit is None else min(HomeworkStore.CHUNK_SIZE, limit - written)
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            f.write(chunk)
+            written += len(chunk)
+        return written
+
+    @staticmethod
+    def hash_file(path):
+        """SHA-256 of a file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HomeworkStore.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def save_stream(email, filename, stream):
+        """
+        Stream an uploaded file to disk and record it as a submission.
+
+        Returns:
+            the submission id
+
+        Raises:
+            ValueError if the file is larger than MAX_UPLOAD_SIZE
+        """
+        HomeworkStore.cleanup_stale_uploads()
+        os.makedirs(os.path.join(UPLOAD_FOLDER, 'partial'), exist_ok=True)
+        temp_path = HomeworkStore.partial_path(secrets.token_hex(16))
+        with open(temp_path, 'wb') as f:
+            written = HomeworkStore.copy_stream(stream, f, limit=MAX_UPLOAD_SIZE + 1)
+        if written > MAX_UPLOAD_SIZE:
+            os.remove(temp_path)
+            raise ValueError(written)
+        return HomeworkStore.store(email, filename, temp_path)
+
+    @staticmethod
+    def store(email, filename, temp_path):
+        """
+        Move a fully received file into the content-addressed store
+        (or drop it if an identical file is already stored) and add the submission row.
+        Also refreshes the student's homework_submitted count on the dashboard.
+        """
+        sha256 = HomeworkStore.hash_file(temp_path)
+        size = os.path.getsize(temp_path)
+        target = HomeworkStore.object_path(sha256)
+        if os.path.exists(target):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temp_path, target)
+
+        now = Database.timestamp()
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO homework_files (sha256, size, created_at) VALUES (?, ?, ?)",
+                       (sha256, size, now))
+        cursor.execute('''
+            INSERT INTO homework_submissions (email, sha256, filename, size, submitted_at) VALUES (?, ?, ?, ?, ?)
+        ''', (email, sha256, filename, size, now))
+        submission_id = cursor.lastrowid
+        cursor.execute('''
+            UPDATE dashboard SET homework_submitted=(SELECT COUNT(*) FROM homework_submissions WHERE email=?), updated_at=?
+            WHERE email=?
+        ''', (email, now, email))
+        EventBus.publish_rows(cursor, 'dashboard', email)
+        conn.commit()
+        conn.close()
+        return submission_id
+
+    @staticmethod
+    def start_upload(email, filename, size):
+        """
+        Begin a resumable upload.
+
+        Returns:
+            the upload id
+
+        Raises:
+            ValueError if size is larger than MAX_UPLOAD_SIZE
+        """
+        if size > MAX_UPLOAD_SIZE:
+            raise ValueError(size)
+        HomeworkStore.cleanup_stale_uploads()
+        upload_id = secrets.token_urlsafe(16)
+        os.makedirs(os.path.join(UPLOAD_FOLDER, 'partial'), exist_ok=True)
+        open(HomeworkStore.partial_path(upload_id), 'wb').close()
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO homework_uploads (id, email, filename, size, received, created_at) VALUES (?, ?, ?, ?, 0, ?)
+        ''', (upload_id, email, filename, size, Database.timestamp()))
+        conn.commit()
+        conn.close()
+        return upload_id
+
+    @staticmethod
+    def get_upload(upload_id, email):
+        """
+        Retrieve an in-progress upload owned by the user.
+
+        Returns:
+            dict(filename, size, received) if it exists, else None
+        """
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT filename, size, received FROM homework_uploads WHERE id=? AND email=?", (upload_id, email))
+        row = cursor.fetchone()
+        conn.close()
+        return {'filename': row[0], 'size': row[1], 'received': row[2]} if row else None
+
+    @staticmethod
+    def append_chunk(upload_id, email, offset, length, stream):
+        """
+        Append one chunk to a resumable upload.
+        The chunk must start exactly where the previous one ended. It is claimed
+        atomically (received is advanced first, if it still equals the offset), so
+        a retried chunk that overlaps one still being written is rejected, and
+        only one request ever finishes the upload.
+
+        Returns:
+            tuple(received, submission_id); submission_id is None until the last chunk arrives
+
+        Raises:
+            KeyError if the upload does not exist, ValueError if the offset is wrong
+            or the upload is larger than MAX_UPLOAD_SIZE
+        """
+        upload = HomeworkStore.get_upload(upload_id, email)
+        if upload is None:
+            raise KeyError(upload_id)
+        if (offset != upload['received'] or offset + length > upload['size']
+                or upload['size'] > MAX_UPLOAD_SIZE):
+            raise ValueError(upload['received'])
+
+        claimed = offset + length
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE homework_uploads SET received=? WHERE id=? AND received=?",
+                       (claimed, upload_id, offset))
+        conn.commit()
+        won = cursor.rowcount == 1
+        conn.close()
+        if not won:
+            current = HomeworkStore.get_upload(upload_id, email)
+            if current is None:
+                raise KeyError(upload_id)
+            raise ValueError(current['received'])
+
+        received = offset
+        path = HomeworkStore.partial_path(upload_id)
+        try:
+            with open(path, 'r+b') as f:
+                f.seek(offset)
+                received += HomeworkStore.copy_stream(stream, f, limit=length)
+        finally:
+            if received < claimed:
+                # Short or failed chunk: release the rest of the claim so the client can resume
+                conn = Database.connect()
+                conn.execute("UPDATE homework_uploads SET received=? WHERE id=? AND received=?",
+                             (received, upload_id, claimed))
+                conn.commit()
+                conn.close()
+        if received < upload['size']:
+            return received, None
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM homework_uploads WHERE id=?", (upload_id,))
+        conn.commit()
+        conn.close()
+        return received, HomeworkStore.store(email, upload['filename'], path)
+
+    @staticmethod
+    def cleanup_stale_uploads():
+        """
+        Remove resumable uploads whose partial file has not changed for STALE_AFTER,
+        and partial files no upload refers to.
+
+        Returns:
+            number of partial files removed
+        """
+        partial_dir = os.path.join(UPLOAD_FOLDER, 'partial')
+        cutoff = time.time() - HomeworkStore.STALE_AFTER.total_seconds()
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM homework_uploads")
+        active = set()
+        for (upload_id,) in cursor.fetchall():
+            path = HomeworkStore.partial_path(upload_id)
+            if os.path.exists(path) and os.path.getmtime(path) >= cutoff:
+                active.add(upload_id)
+            else:
+                cursor.execute("DELETE FROM homework_uploads WHERE id=?", (upload_id,))
+        conn.commit()
+        conn.close()
+
+        removed = 0
+        if os.path.isdir(partial_dir):
+            for name in os.listdir(partial_dir):
+                path = os.path.join(partial_dir, name)
+                if name not in active and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    @staticmethod
+    def list_submissions(email):
+        """All homework submissions for a user, newest first."""
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, filename, size, submitted_at FROM homework_submissions WHERE email=? ORDER BY id DESC
+        ''', (email,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{'id': r[0], 'filename': r[1], 'size': r[2], 'submitted_at': r[3]} for r in rows]
+
+    @staticmethod
+    def get_submission(submission_id):
+        """
+        Retrieve a submission for download.
+
+        Returns:
+            tuple(email, sha256, filename) if it exists, else None
+        """
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT email, sha256, filename FROM homework_submissions WHERE id=?", (submission_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row
+
+# ----------------------------------------
+# Archive Class
+# ----------------------------------------
+class Archive:
+    """
+    Moves rows from past terms out of site.db into compressed, read-only
+    archive databases so the hot database (and its indexes) stay small.
+
+    Each run writes ARCHIVE_FOLDER/before_<boundary>_<run>.db.gz holding
+    the rows older than the term boundary, checks row counts at every
+    step, and records an integrity report in archive_log. Archives are
+    only attached by history_rows(), when a query asks for past terms.
+
+    dashboard and weekly_schedule hold each user's one live row, so those
+    are snapshotted into the archive and stay in site.db; only invoices
+    (historical records) are moved out. Each run only snapshots the rows
+    changed since the previous run, so unchanged rows are archived once.
+    """
+
+    # Archived tables and the timestamp column compared with the term boundary
+    TABLES = {
+        'weekly_schedule': 'updated_at',
+        'dashboard': 'updated_at',
+        'invoices': 'created_at',
+    }
+    # Tables whose rows are copied into the archive but kept in site.db
+    SNAPSHOT_TABLES = {'weekly_schedule', 'dashboard'}
+    # Archives attached at once by history_rows (SQLite allows at most 10)
+    ATTACH_BATCH = 8
+
+    @staticmethod
+    def cache_path(archive_file):
+        """Decompressed, read-only copy of an archive used for attaching."""
+        name = os.path.basename(archive_file)[:-len('.gz')]
+        return os.path.join(ARCHIVE_FOLDER, 'cache', name)
+
+    @staticmethod
+    def decompress(archive_file):
+        """Return the path of an up-to-date decompressed copy of an archive."""
+        path = Archive.cache_path(archive_file)
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(archive_file):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique per call, so concurrent first reads do not race on one temp file
+            temp_path = f"{path}.{secrets.token_hex(8)}.tmp"
+            with gzip.open(archive_file, 'rb') as src, open(temp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, path)
+        return path
+
+    @staticmethod
+    def snapshot_start(cursor, table):
+        """
+        Earliest timestamp of a snapshot table's rows not yet in any archive:
+        the earlier of the previous run's boundary and the time it started
+        (rows changed since then have a newer timestamp). '' if never archived.
+        """
+        cursor.execute("SELECT boundary, created_at FROM archive_log WHERE table_name=? ORDER BY id DESC LIMIT 1",
+                       (table,))
+        row = cursor.fetchone()
+        return min(row) if row else ''
+
+    @staticmethod
+    def run(boundary):
+        """
+        Archive every row whose timestamp is before the boundary (YYYY-MM-DD).
+        Snapshot tables only contribute the rows changed since the previous run.
+
+        The archive is written, compressed and verified before anything is
+        deleted; the delete and the archive_log entries are then committed
+        in one transaction, so site.db never loses rows that are not in a
+        logged archive.
+
+        Returns:
+            list of dicts (table, rows_selected, rows_archived, rows_deleted, rows_verified, archive_file)
+
+        Raises:
+            ValueError if the boundary is not a date, RuntimeError if any row count does not match
+            (nothing is removed from site.db in that case)
+        """
+        boundary = date.fromisoformat(boundary).isoformat()
+        os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+        run_stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+        db_path = os.path.join(ARCHIVE_FOLDER, f'before_{boundary}_{run_stamp}.db')
+        archive_file = db_path + '.gz'
+        started = Database.timestamp()
+
+        # Copy the rows into a new archive database; site.db is only read
+        conn = Database.connect()
+        conn.isolation_level = None  # Manage the transactions explicitly so they span both databases
+        cursor = conn.cursor()
+        cursor.execute("ATTACH DATABASE ? AS archive", (db_path,))
+        report = []
+        try:
+            cursor.execute("BEGIN")
+            for table, column in Archive.TABLES.items():
+                where, params = f"{column} < ?", (boundary,)
+                if table in Archive.SNAPSHOT_TABLES:
+                    where, params = f"{column} >= ? AND {where}", (Archive.snapshot_start(cursor, table), boundary)
+                cursor.execute(f"CREATE TABLE archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+                cursor.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where}", params)
+                selected = cursor.fetchone()[0]
+                cursor.execute(f"INSERT INTO archive.{table} SELECT * FROM main.{table} WHERE {where}", params)
+                cursor.execute(f"SELECT COUNT(*) FROM archive.{table}")
+                archived = cursor.fetchone()[0]
+                if selected != archived:
+                    raise RuntimeError(f"{table}: selected {selected}, archived {archived}")
+                report.append({'table': table, 'rows_selected': selected, 'rows_archived': archived})
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            cursor.execute("DETACH DATABASE archive")
+            conn.close()
+            os.remove(db_path)
+            raise
+        cursor.execute("DETACH DATABASE archive")
+
+        if not any(entry['rows_archived'] for entry in report):
+            conn.close()
+            os.remove(db_path)
+            return [dict(entry, rows_deleted=0, rows_verified=0, archive_file=None) for entry in report]
+
+        # Compress the archive, make it read-only and verify it by reading it back
+        try:
+            with open(db_path, 'rb') as src, gzip.open(archive_file, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.chmod(archive_file, 0o444)
+            verify_path = Archive.decompress(archive_file)
+            archive_conn = sqlite3.connect(f"file:{verify_path}?mode=ro", uri=True)
+            for entry in report:
+                entry['rows_verified'] = archive_conn.execute(f"SELECT COUNT(*) FROM {entry['table']}").fetchone()[0]
+                entry['archive_file'] = archive_file
+            archive_conn.close()
+            mismatched = [e['table'] for e in report if e['rows_verified'] != e['rows_archived']]
+            if mismatched:
+                raise RuntimeError(f"Archive {archive_file} does not match for: {', '.join(mismatched)}")
+        except Exception:
+            conn.close()
+            for path in (archive_file, Archive.cache_path(archive_file)):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            os.remove(db_path)
+
+        # Remove the archived rows and log the archive in one transaction
+        cursor.execute("ATTACH DATABASE ? AS archive", (f"file:{verify_path}?mode=ro",))
+        try:
+            cursor.execute("BEGIN")
+            for entry in report:
+                table = entry['table']
+                entry['rows_deleted'] = 0
+                if table not in Archive.SNAPSHOT_TABLES:
+                    cursor.execute(f"DELETE FROM main.{table} WHERE id IN (SELECT id FROM archive.{table})")
+                    entry['rows_deleted'] = cursor.rowcount
+                    if entry['rows_deleted'] != entry['rows_archived']:
+                        raise RuntimeError(f"{table}: archived {entry['rows_archived']}, deleted {entry['rows_deleted']}")
+                cursor.execute('''
+                    INSERT INTO archive_log (boundary, table_name, archive_file, rows_selected, rows_archived,
+                                             rows_deleted, rows_verified, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (boundary, table, archive_file, entry['rows_selected'], entry['rows_archived'],
+                      entry['rows_deleted'], entry['rows_verified'], started))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            cursor.execute("DETACH DATABASE archive")
+            conn.close()
+            os.remove(archive_file)
+            raise
+        cursor.execute("DETACH DATABASE archive")
+        # Reclaim the space so site.db and its indexes stay small
+        cursor.execute("VACUUM")
+        conn.close()
+        return report
+
+    @staticmethod
+    def history_rows(table, start, end):
+        """
+        Rows of an archived table whose timestamp is in [start, end),
+        from site.db plus every archive that can hold rows in that range.
+        Archives are attached ATTACH_BATCH at a time to stay under SQLite's
+        attach limit. Identical rows (a live row and its snapshot) appear once.
+        """
+        column = Archive.TABLES[table]
+        conn = Database.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT archive_file FROM archive_log WHERE boundary > ? AND rows_archived > 0 "
+                       "AND table_name = ?", (start, table))
+        archive_files = [row[0] for row in cursor.fetchall() if os.path.exists(row[0])]
+        cursor.execute(f"PRAGMA main.table_info({table})")
+        columns = [row[1] for row in cursor.fetchall()]
+
+        cursor.execute(f"SELECT {','.join(columns)} FROM main.{table} WHERE {column} >= ? AND {column} < ?",
+                       (start, end))
+        rows = cursor.fetchall()
+        for i in range(0, len(archive_files), Archive.ATTACH_BATCH):
+            aliases = []
+            for archive_file in archive_files[i:i + Archive.ATTACH_BATCH]:
+                alias = f"archive_{len(aliases)}"
+                cursor.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{Archive.decompress(archive_file)}?mode=ro",))
+                aliases.append(alias)
+            selects = []
+            for alias in aliases:
+                cursor.execute(f"PRAGMA {alias}.table_info({table})")
+                archived_columns = {row[1] for row in cursor.fetchall()}
+                # Columns added since the archive was written read as NULL
+                select_list = ','.join(c if c in archived_columns else f"NULL AS {c}" for c in columns)
+                selects.append(f"SELECT {select_list} FROM {alias}.{table} WHERE {column} >= ? AND {column} < ?")
+            cursor.execute(" UNION ALL ".join(selects), (start, end) * len(selects))
+            rows += cursor.fetchall()
+            for alias in aliases:
+                cursor.execute(f"DETACH DATABASE {alias}")
+        conn.close()
+
+        position = columns.index(column)
+        return sorted(set(rows), key=lambda row: (row[position] or '', row[0]))
+
+# ----------------------------------------
+# Compression Class
+# ----------------------------------------
+class Compression:
+    """
+    Negotiates gzip (and brotli, when the brotli package is installed)
+    for dynamic responses, and serves precompressed .br/.gz siblings of
+    static files written by compress_static.py.
+    """
+
+    MIN_SIZE = 1024  # Bytes; smaller bodies are not worth compressing
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    MIMETYPES = {'text/html', 'text/css', 'text/plain', 'text/calendar', 'text/javascript',
+                 'application/javascript', 'application/json', 'application/manifest+json', 'image/svg+xml'}
+    # Precompressed static variants in order of preference
+    STATIC_VARIANTS = [('br', '.br'), ('gzip', '.gz')]
+
+    @staticmethod
+    def accepts(encoding):
+        """Return True if the client accepts the given content coding."""
+        return request.accept_encodings.quality(encoding) > 0
+
+    @staticmethod
+    def choose_encoding():
+        """Pick the best content coding for a dynamic response, or None."""
+        if brotli is not None and Compression.accepts('br'):
+            return 'br'
+        if Compression.accepts('gzip'):
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def compress(data, encoding):
+        """Compress a whole response body."""
+        if encoding == 'br':
+            return brotli.compress(data, quality=Compression.BROTLI_QUALITY)
+        return gzip.compress(data, compresslevel=Compression.GZIP_LEVEL, mtime=0)
+
+    @staticmethod
+    def compress_stream(chunks, encoding):
+        """Compress a streamed response body chunk by chunk without buffering it."""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=Compression.BROTLI_QUALITY)
+            process, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(Compression.GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+            process, finish = compressor.compress, compressor.flush
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = process(chunk)
+            if out:
+                yield out
+        yield finish()
+
+    @staticmethod
+    def compress_response(response):
+        """Compress a dynamic response in place if it is eligible."""
+        if (response.direct_passthrough or response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in Compression.MIMETYPES):
+            return response
+
+        # The body may differ by Accept-Encoding, whether or not this one is compressed
+        response.vary.add('Accept-Encoding')
+        encoding = Compression.choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = Compression.compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        if response.calculate_content_length() < Compression.MIN_SIZE:
+            return response
+
+        # A strong ETag identifies one representation, so the encoded body gets its own
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        response.set_data(Compression.compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_fresh(path, variant_path):
+        """True if a precompressed sibling exists and is not older than its source file."""
+        try:
+            return os.path.isfile(variant_path) and os.path.getmtime(variant_path) >= os.path.getmtime(path)
+        except OSError:
+            return False
+
+    @staticmethod
+    def send_static(filename):
+        """
+        Serve a static file, preferring a precompressed sibling the client accepts.
+        A sibling older than the file itself is stale (compress_static.py was not
+        re-run after an edit) and is ignored.
+        """
+        path = safe_join(app.static_folder, filename)
+        if path is None:
+            abort(404)
+        variants = [(encoding, suffix) for encoding, suffix in Compression.STATIC_VARIANTS
+                    if Compression.is_fresh(path, path + suffix)]
+        for encoding, suffix in variants:
+            if Compression.accepts(encoding):
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype,
+                                               max_age=app.get_send_file_max_age(filename))
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+        response = app.send_static_file(filename)
+        if variants:
+            response.vary.add('Accept-Encoding')
+        return response
+
+# ----------------------------------------
+# ServiceWorker Class
+# ----------------------------------------
+class ServiceWorker:
+    """
+    Builds the offline-first service worker for the student portal.
+
+    The worker script is rendered from templates/service_worker.js with a
+    precache manifest of every file under static/ (each with a content
+    revision), so its version changes whenever a static file does and
+    browsers install the new worker.
+
+    Every HTML response carries an X-Portal-User header with an opaque key for
+    the logged-in user (empty when logged out). The worker keeps portal
+    pages in a per-user cache and drops other users' caches when the key
+    changes. Queued offline saves are replayed with an X-Offline-Replay
+    header holding the key of the user who made them; the form handlers
+    then answer with a JSON status instead of a redirect.
+    """
+
+    # Public pages served stale-while-revalidate
+    PUBLIC_ENDPOINTS = ['about', 'services', 'our_locations']
+    # Portal pages served network-first with the last-known copy kept offline
+    PORTAL_ENDPOINTS = ['home', 'dashboard', 'weekly_schedule']
+    # Form posts queued while offline and replayed on reconnect
+    QUEUED_WRITE_ENDPOINTS = ['dashboard', 'weekly_schedule']
+
+    _manifest_cache = (None, [])
+
+    @staticmethod
+    def user_key(username):
+        """Opaque, stable key for a user that does not reveal the username ('' when logged out)."""
+        if not username:
+            return ''
+        return hmac.new(app.secret_key.encode('utf-8'), username.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+    @staticmethod
+    def replay_user():
+        """User key sent by the service worker when replaying a queued save, else None."""
+        return request.headers.get('X-Offline-Replay')
+
+    @staticmethod
+    def replay_check():
+        """
+        Check a replayed save before it is applied.
+
+        Returns:
+            a JSON error response if the save must wait (logged out, or a different
+            user is logged in on this device), else None
+        """
+        if 'username' not in session:
+            return jsonify({'status': 'login-required'}), 401
+        if ServiceWorker.replay_user() != ServiceWorker.user_key(session['username']):
+            return jsonify({'status': 'different-user'}), 409
+        return None
+
+    @staticmethod
+    def precache_manifest():
+        """
+        List of {url, revision} for every static file, excluding precompressed siblings.
+        Files are only re-hashed when their size or modification time changes.
+        """
+        files = []
+        for root, dirs, names in os.walk(app.static_folder):
+            for name in sorted(names):
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((os.path.relpath(path, app.static_folder).replace(os.sep, '/'),
+                              stat.st_size, stat.st_mtime))
+        signature = tuple(sorted(files))
+        if ServiceWorker._manifest_cache[0] == signature:
+            return ServiceWorker._manifest_cache[1]
+
+        manifest = []
+        for filename, size, mtime in signature:
+            revision = HomeworkStore.hash_file(os.path.join(app.static_folder, filename))[:12]
+            manifest.append({'url': url_for('static', filename=filename), 'revision': revision})
+        ServiceWorker._manifest_cache = (signature, manifest)
+        return manifest
+
+    @staticmethod
+    def render():
+        """Render the service worker script."""
+        manifest = ServiceWorker.precache_manifest()
+        context = {
+            'manifest': manifest,
+            'public_pages': [url_for(e) for e in ServiceWorker.PUBLIC_ENDPOINTS],
+            'portal_pages': [url_for(e) for e in ServiceWorker.PORTAL_ENDPOINTS],
+            'queued_writes': [url_for(e) for e in ServiceWorker.QUEUED_WRITE_ENDPOINTS],
+        }
+        context['version'] = hashlib.sha256(json.dumps(context, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        return render_template('service_worker.js', **context)
+
 # ----------------------------------------
 # Initialize Database
 # ----------------------------------------
-if not os.path.exists(DATABASE):
-    Database.init_db()
+# Tables are created with IF NOT EXISTS, so this also adds new tables to an existing site.db
+Database.init_db()
 
 # ----------------------------------------
 # Routes
 # ----------------------------------------
+# Static files are served through Compression so precompressed siblings are used
+app.view_functions['static'] = Compression.send_static
+
+@app.after_request
+def tag_portal_user(response):
+    """Tell the service worker whose pages these are (see ServiceWorker)."""
+    if response.mimetype == 'text/html':
+        response.headers['X-Portal-User'] = ServiceWorker.user_key(session.get('username'))
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress eligible dynamic responses (see Compression)."""
+    return Compression.compress_response(response)
+
 @app.route('/')
 def index():
     """
@@ -516,20 +1954,133 @@ def dashboard():
     """
     Dashboard page for user.
     Shows current dashboard data and allows updates.
+    Saves replayed by the service worker get a JSON status instead of a redirect.
     """
+    replay = ServiceWorker.replay_user() is not None and request.method == 'POST'
+    if replay:
+        error = ServiceWorker.replay_check()
+        if error:
+            return error
     if 'username' not in session:
         return redirect(url_for('login'))
     dashboard = Dashboard(session['username'])
     if request.method == 'POST':
         data_dict = {field: request.form.get(field,'').strip() for field in Dashboard.FIELDS}
+        # Submission counts come from the homework store once the user has uploaded work
+        submissions = HomeworkStore.list_submissions(session['username'])
+        if submissions:
+            data_dict['homework_submitted'] = str(len(submissions))
         if any(not v for v in data_dict.values()):
+            if replay:
+                return jsonify({'status': 'invalid', 'message': "All dashboard fields are required!"}), 422
             flash("All dashboard fields are required!", "error")
             return redirect(url_for('dashboard'))
         dashboard.update_data(data_dict)
+        if replay:
+            return jsonify({'status': 'saved'})
         flash("Dashboard updated successfully!", "success")
         return redirect(url_for('weekly_schedule'))
     data = dashboard.get_data()
-    return render_template('dashboard.html', username=session['username'], dashboard_data=data)
+    submissions = HomeworkStore.list_submissions(session['username'])
+    return render_template('dashboard.html', username=session['username'], dashboard_data=data,
+                           submissions=submissions)
+
+#Homework submission app route 
+@app.route('/homework/submit', methods=['POST'])
+def homework_submit():
+    """
+    Handles a homework file submitted from the dashboard form.
+    The file is streamed into the homework store in chunks.
+    """
+    if 'username' not in session:
+        return redirect(url_for('login'))
+    upload = request.files.get('homework')
+    filename = secure_filename(upload.filename) if upload else ''
+    if not filename:
+        flash("Please choose a file to submit!", "error")
+        return redirect(url_for('dashboard'))
+    try:
+        HomeworkStore.save_stream(session['username'], filename, upload.stream)
+    except ValueError:
+        flash(f"Homework files must be at most {MAX_UPLOAD_SIZE // (1024 * 1024)} MB!", "error")
+        return redirect(url_for('dashboard'))
+    flash("Homework submitted successfully!", "success")
+    return redirect(url_for('dashboard'))
+
+#Resumable homework upload app routes 
+@app.route('/homework/uploads', methods=['POST'])
+def homework_upload_start():
+    """
+    Starts a resumable homework upload.
+    Expects filename and size (bytes) as a JSON object or form fields;
+    returns the upload id to send chunks to.
+    """
+    if 'username' not in session:
+        return jsonify({'error': 'Login required'}), 401
+    data = request.get_json(silent=True)
+    if data is None:
+        data = request.form
+    elif not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    filename = secure_filename(str(data.get('filename', '')))
+    try:
+        size = int(data.get('size', ''))
+    except (TypeError, ValueError):
+        size = -1
+    if not filename or size <= 0:
+        return jsonify({'error': 'A filename and a positive size are required'}), 400
+    if size > MAX_UPLOAD_SIZE:
+        return jsonify({'error': 'File is too large', 'max_size': MAX_UPLOAD_SIZE}), 413
+    upload_id = HomeworkStore.start_upload(session['username'], filename, size)
+    return jsonify({'upload_id': upload_id, 'received': 0, 'size': size}), 201
+
+@app.route('/homework/uploads/<upload_id>', methods=['GET', 'PUT'])
+def homework_upload_chunk(upload_id):
+    """
+    GET reports how many bytes have been received so a client can resume.
+    PUT appends the request body, described by a Content-Range header
+    (bytes start-end/size), to the upload.
+    """
+    if 'username' not in session:
+        return jsonify({'error': 'Login required'}), 401
+    upload = HomeworkStore.get_upload(upload_id, session['username'])
+    if upload is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    if request.method == 'GET':
+        return jsonify({'upload_id': upload_id, 'received': upload['received'], 'size': upload['size']})
+
+    content_range = parse_content_range_header(request.headers.get('Content-Range'))
+    if content_range is None or content_range.units != 'bytes' or content_range.length != upload['size']:
+        return jsonify({'error': 'A valid Content-Range header is required'}), 400
+    if upload['size'] > MAX_UPLOAD_SIZE:
+        return jsonify({'error': 'File is too large', 'max_size': MAX_UPLOAD_SIZE}), 413
+    try:
+        received, submission_id = HomeworkStore.append_chunk(
+            upload_id, session['username'], content_range.start,
+            content_range.stop - content_range.start, request.stream)
+    except KeyError:
+        return jsonify({'error': 'Unknown upload'}), 404
+    except ValueError as e:
+        return jsonify({'error': 'Chunk does not continue the upload', 'received': e.args[0]}), 409
+    if submission_id is None:
+        return jsonify({'upload_id': upload_id, 'received': received, 'size': upload['size']})
+    return jsonify({'submission_id': submission_id, 'received': received, 'size': upload['size']}), 201
+
+#Homework download app route 
+@app.route('/homework/<int:submission_id>')
+def homework_download(submission_id):
+    """
+    Downloads a submitted homework file.
+    Sent straight from disk (sendfile where the server supports it) with Range support.
+    """
+    if 'username' not in session:
+        return redirect(url_for('login'))
+    submission = HomeworkStore.get_submission(submission_id)
+    if submission is None or submission[0] != session['username']:
+        abort(404)
+    email, sha256, filename = submission
+    return send_file(os.path.abspath(HomeworkStore.object_path(sha256)), as_attachment=True,
+                     download_name=filename, conditional=True)
 
 #Weekly schedule page app route 
 @app.route('/weekly_schedule', methods=['GET','POST'])
@@ -537,7 +2088,13 @@ def weekly_schedule():
     """
     Weekly schedule page.
     Shows and updates weekly schedule for the logged-in user.
+    Saves replayed by the service worker get a JSON status instead of a redirect.
     """
+    replay = ServiceWorker.replay_user() is not None and request.method == 'POST'
+    if replay:
+        error = ServiceWorker.replay_check()
+        if error:
+            return error
     if 'username' not in session:
         return redirect(url_for('login'))
     ws = WeeklySchedule(session['username'])
@@ -546,13 +2103,35 @@ def weekly_schedule():
         schedule_dict['month'] = request.form.get('month','').strip()
         schedule_dict['week'] = request.form.get('week','').strip()
         if any(not v for v in schedule_dict.values()):
+            if replay:
+                return jsonify({'status': 'invalid', 'message': "All fields are required!"}), 422
             flash("All fields are required!", "error")
             return redirect(url_for('weekly_schedule'))
         ws.update_data(schedule_dict)
+        if replay:
+            return jsonify({'status': 'saved'})
         flash("Weekly schedule saved!", "success")
         return redirect(url_for('view_database'))
     data = ws.get_data()
-    return render_template('weekly_schedule.html', schedule_data=data)
+    feed_url = url_for('calendar_feed', token=CalendarFeed(session['username']).get_token(), _external=True)
+    return render_template('weekly_schedule.html', schedule_data=data, feed_url=feed_url)
+
+#Calendar feed app route 
+@app.route('/calendar/<token>.ics')
+def calendar_feed(token):
+    """
+    Subscribable iCalendar feed of a user's weekly schedule.
+    Served from the cached output with a strong ETag so unchanged polls get a 304.
+    """
+    feed = CalendarFeed.get_by_token(token)
+    if feed is None:
+        abort(404)
+    ics, etag = feed
+    response = Response(ics, mimetype='text/calendar')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 #Invoices page app route 
 @app.route('/invoices', methods=['GET', 'POST'])
@@ -672,19 +2251,112 @@ def invoices():
 def view_database():
     """
     Displays all records from registrations, dashboard, weekly_schedule, and invoices tables.
+    Past terms are included only when a range is requested (?from=YYYY-MM-DD&to=YYYY-MM-DD).
     """
     conn = Database.connect()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM registrations")
     regs = cursor.fetchall()
-    cursor.execute("SELECT * FROM dashboard")
-    dash = cursor.fetchall()
-    cursor.execute("SELECT * FROM weekly_schedule")
-    sched = cursor.fetchall()
-    cursor.execute("SELECT * FROM invoices")
-    invs = cursor.fetchall()
-    conn.close()
-    return render_template("view_database.html", registrations=regs, dashboard=dash, weekly_sched=sched, invoices=invs)
+    start = request.args.get('from', '').strip()
+    if start:
+        end = request.args.get('to', '').strip() or '9999-12-31'
+        conn.close()
+        dash = Archive.history_rows('dashboard', start, end)
+        sched = Archive.history_rows('weekly_schedule', start, end)
+        invs = Archive.history_rows('invoices', start, end)
+    else:
+        cursor.execute("SELECT * FROM dashboard")
+        dash = cursor.fetchall()
+        cursor.execute("SELECT * FROM weekly_schedule")
+        sched = cursor.fetchall()
+        cursor.execute("SELECT * FROM invoices")
+        invs = cursor.fetchall()
+        conn.close()
+    # Streamed so large dumps are sent (and compressed) as they render
+    return stream_template("View_database.html", registrations=regs, dashboard=dash, weekly_sched=sched, invoices=invs)
+
+#Tutor matching app route 
+@app.route('/match', methods=['GET', 'POST'])
+def match():
+    """
+    Tutor matching for a student.
+    GET returns ranked tutor candidates as JSON; POST assigns the best one.
+    The student defaults to the logged-in user; only tutors may pass another ?email=.
+    """
+    if 'username' not in session:
+        return redirect(url_for('login'))
+    student_email = (request.values.get('email') or session['username']).strip()
+    if student_email != session['username'] and not TutorMatcher.is_tutor(session['username']):
+        return jsonify({'error': 'Only tutors can match other students'}), 403
+    if request.method == 'POST':
+        best = TutorMatcher.assign(student_email)
+        if best is None:
+            return jsonify({'student': student_email, 'error': 'No compatible tutor found'}), 404
+        return jsonify({'student': student_email, 'match': best})
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 100))
+    except ValueError:
+        limit = 10
+    return jsonify({'student': student_email, 'candidates': TutorMatcher.rank(student_email, limit)})
+
+#Batch tutor matching app route 
+@app.route('/match/batch', methods=['POST'])
+def match_batch():
+    """Assigns tutors to every unmatched student in one pass (tutors only)."""
+    if 'username' not in session:
+        return redirect(url_for('login'))
+    if not TutorMatcher.is_tutor(session['username']):
+        return jsonify({'error': 'Only tutors can run batch matching'}), 403
+    return jsonify({'assigned': TutorMatcher.assign_intake()})
+
+#Live updates app route 
+@app.route('/events')
+def events():
+    """
+    Server-Sent Events stream of database changes for logged-in users.
+    By default only the user's own changes are sent; ?scope=all sends
+    every change (used by the database view).
+    """
+    if 'username' not in session:
+        return Response(status=401)
+    email = None if request.args.get('scope') == 'all' else session['username']
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        last_id = 0
+    response = Response(EventBus.stream(EventBus.subscribe(), last_id, email), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
+
+#Service worker app route 
+@app.route('/service-worker.js')
+def service_worker():
+    """
+    Generated service worker, served from the site root so it controls every page.
+    Revalidated on each check (ETag) so a new static manifest is picked up promptly.
+    """
+    script = ServiceWorker.render()
+    response = Response(script, mimetype='application/javascript')
+    response.set_etag(hashlib.sha256(script.encode('utf-8')).hexdigest())
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+#Web app manifest app route 
+@app.route('/manifest.webmanifest')
+def web_manifest():
+    """Web app manifest so the student portal can be installed."""
+    manifest = {
+        'name': 'sySTEM@TECH Learning Management System',
+        'short_name': 'sySTEM@TECH',
+        'start_url': url_for('home'),
+        'scope': '/',
+        'display': 'standalone',
+        'background_color': '#f6f8ff',
+        'theme_color': '#ffcc00',
+        'icons': [{'src': url_for('static', filename='system_logo.jpg'), 'sizes': 'any', 'type': 'image/jpeg'}],
+    }
+    return Response(json.dumps(manifest), mimetype='application/manifest+json')
 
 # ----------------------------------------
 # Run the Flask App
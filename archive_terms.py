@@ -0,0 +1,35 @@
+import sys
+
+from app import Archive
+
+# ----------------------------------------
+# Archive past terms
+# Usage: python archive_terms.py YYYY-MM-DD
+# Moves invoices older than the term boundary out of site.db, snapshots
+# weekly_schedule and dashboard rows changed since the previous run and
+# last updated before it (the live rows stay in site.db), and prints the
+# integrity report.
+# ----------------------------------------
+if len(sys.argv) != 2:
+    print("Usage: python archive_terms.py YYYY-MM-DD  (first day of the term to keep)")
+    sys.exit(1)
+
+try:
+    report = Archive.run(sys.argv[1])
+except ValueError:
+    print(f"Invalid term boundary {sys.argv[1]!r}; expected YYYY-MM-DD.")
+    sys.exit(1)
+except RuntimeError as e:
+    print(f"Archival aborted, row counts did not match: {e}")
+    sys.exit(1)
+
+print(f"{'Table':<18}{'Selected':>10}{'Archived':>10}{'Deleted':>10}{'Verified':>10}")
+for entry in report:
+    print(f"{entry['table']:<18}{entry['rows_selected']:>10}{entry['rows_archived']:>10}"
+          f"{entry['rows_deleted']:>10}{entry['rows_verified']:>10}")
+
+archive_file = report[0]['archive_file'] if report else None
+if archive_file:
+    print(f"All row counts match. Archive written to {archive_file}")
+else:
+    print("No rows older than the boundary; nothing archived.")
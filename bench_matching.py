@@ -0,0 +1,73 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+import app
+from app import Database, TutorMatcher
+
+# ----------------------------------------
+# Tutor matching benchmark
+# Usage: python bench_matching.py [tutors] [students]
+# Runs against a throwaway database, never site.db.
+# ----------------------------------------
+TUTORS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+STUDENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+SUBJECTS = ["STEM", "Robotics and Programming", "Calligraphy", "NAPLAN/VCE/Scholarship"]
+LOCATIONS = ["Derrimut", "Williams Landing", "Online"]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+random.seed(42)
+tmp_dir = tempfile.mkdtemp()
+app.DATABASE = os.path.join(tmp_dir, "bench.db")
+Database.init_db()
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def populate():
+    """Insert registrations, index rows and tutor schedules the same way Registration.save does."""
+    conn = Database.connect()
+    cursor = conn.cursor()
+    for i in range(TUTORS + STUDENTS):
+        role = "Tutor" if i < TUTORS else "Student"
+        email = f"{role.lower()}{i}@example.com"
+        subjects = random.sample(SUBJECTS, random.randint(1, 3))
+        locations = random.sample(LOCATIONS, random.randint(1, 2))
+        cursor.execute('''
+            INSERT INTO registrations (fullname, email, dob_day, dob_month, dob_year, gender, role, subjects, locations)
+            VALUES (?, ?, '1', '1', '2000', 'Other', ?, ?, ?)
+        ''', (email, email, role, ",".join(subjects), ",".join(locations)))
+        TutorMatcher.index_registration(cursor, email, role, subjects, locations)
+        if role == "Tutor":
+            busy = {day: random.choice(["", "", "Class"]) for day in DAYS}
+            cursor.execute(f'''
+                INSERT INTO weekly_schedule (email, {','.join(DAYS)}, month, week)
+                VALUES (?, {','.join('?' * len(DAYS))}, '', '')
+            ''', (email, *[busy[day] for day in DAYS]))
+    conn.commit()
+    conn.close()
+
+
+print(f"Tutor matching benchmark: {TUTORS} tutors, {STUDENTS} students")
+timed("populate registrations + indexes", populate)
+
+sample = [f"student{TUTORS + random.randrange(STUDENTS)}@example.com" for _ in range(200)]
+elapsed = timed("rank 200 single students", lambda: [TutorMatcher.rank(s) for s in sample])
+assigned = timed("assign_intake (whole intake)", TutorMatcher.assign_intake)
+print(f"assigned {assigned} of {STUDENTS} students")
+
+conn = Database.connect()
+loads = [row[0] for row in conn.execute("SELECT COUNT(*) FROM tutor_matches GROUP BY tutor_email")]
+conn.close()
+if loads:
+    print(f"tutor load: min {min(loads)}, max {max(loads)}, mean {sum(loads) / len(loads):.1f}")
+
+os.remove(app.DATABASE)
+os.rmdir(tmp_dir)
@@ -0,0 +1,56 @@
+import gzip
+import os
+
+try:
+    import brotli  # Optional: also writes .br files when installed
+except ImportError:
+    brotli = None
+
+# ----------------------------------------
+# Precompress static assets
+# Writes .gz (and .br) siblings next to every file under static/ so the
+# app can serve them without compressing on each request.
+# Run again after changing anything in static/.
+# ----------------------------------------
+STATIC_DIR = "static"
+MIN_SAVING = 0.05  # Keep a sibling only if it is at least 5% smaller than the original
+SUFFIXES = (".gz", ".br")
+
+
+def write_if_smaller(path, original_size, data):
+    """Write a compressed sibling, or remove a stale one if compression does not help."""
+    if len(data) <= original_size * (1 - MIN_SAVING):
+        with open(path, "wb") as f:
+            f.write(data)
+        return True
+    if os.path.exists(path):
+        os.remove(path)
+    return False
+
+
+written = skipped = 0
+for root, dirs, files in os.walk(STATIC_DIR):
+    for name in files:
+        if name.endswith(SUFFIXES):
+            continue
+        source = os.path.join(root, name)
+        with open(source, "rb") as f:
+            data = f.read()
+
+        variants = [(source + ".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((source + ".br", lambda: brotli.compress(data, quality=11)))
+
+        for target, compress in variants:
+            # Skip files whose sibling is already up to date
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                continue
+            if write_if_smaller(target, len(data), compress()):
+                written += 1
+                print(f"Wrote {target}")
+            else:
+                skipped += 1
+
+print(f"Precompressed static files: {written} written, {skipped} not worth compressing.")
+if brotli is None:
+    print("brotli is not installed; only .gz files were written.")
@@ -49,7 +49,8 @@ CREATE TABLE IF NOT EXISTS dashboard (
     registered_tutors TEXT,
     registered_students TEXT,
     dropout_tutors TEXT,
-    dropout_students TEXT
+    dropout_students TEXT,
+    updated_at TEXT
 )
 ''')
 
@@ -66,7 +67,8 @@ CREATE TABLE IF NOT EXISTS weekly_schedule (
     saturday TEXT,
     sunday TEXT,
     month TEXT,   -- Can be 1-12 or Jan-Dec
-    week INTEGER  -- 1-10
+    week INTEGER, -- 1-10
+    updated_at TEXT
 )
 ''')
 
@@ -86,10 +88,123 @@ CREATE TABLE IF NOT EXISTS invoices (
     total TEXT,
     payment_method TEXT,
     invoice_date TEXT,
-    username TEXT
+    username TEXT,
+    created_at TEXT
 )
 ''')
 
+# Calendar feeds table (feed token plus cached .ics output and ETag)
+c.execute('''
+CREATE TABLE IF NOT EXISTS calendar_feeds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    token TEXT NOT NULL UNIQUE,
+    ics TEXT,
+    etag TEXT,
+    updated_at TEXT
+)
+''')
+
+# Matching indexes (subject -> registrations, location -> registrations)
+c.execute('''
+CREATE TABLE IF NOT EXISTS registration_subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    role TEXT,
+    subject TEXT NOT NULL
+)
+''')
+c.execute('''
+CREATE TABLE IF NOT EXISTS registration_locations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    role TEXT,
+    location TEXT NOT NULL
+)
+''')
+
+# Tutor matches table (one assigned tutor per student)
+c.execute('''
+CREATE TABLE IF NOT EXISTS tutor_matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_email TEXT NOT NULL UNIQUE,
+    tutor_email TEXT NOT NULL,
+    score REAL,
+    matched_at TEXT
+)
+''')
+
+# Homework files table (content-addressed by SHA-256)
+c.execute('''
+CREATE TABLE IF NOT EXISTS homework_files (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at TEXT
+)
+''')
+
+# Homework submissions table (per-student metadata)
+c.execute('''
+CREATE TABLE IF NOT EXISTS homework_submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    submitted_at TEXT
+)
+''')
+
+# Homework uploads table (resumable uploads in progress)
+c.execute('''
+CREATE TABLE IF NOT EXISTS homework_uploads (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    received INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT
+)
+''')
+
+# Archive log table (integrity report of every archival run)
+c.execute('''
+CREATE TABLE IF NOT EXISTS archive_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    boundary TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    archive_file TEXT NOT NULL,
+    rows_selected INTEGER,
+    rows_archived INTEGER,
+    rows_deleted INTEGER,
+    rows_verified INTEGER,
+    created_at TEXT
+)
+''')
+
+# Events table (change notifications shared by all workers)
+c.execute('''
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    email TEXT,
+    payload TEXT,
+    created_at TEXT
+)
+''')
+
+c.execute("CREATE INDEX IF NOT EXISTS idx_dashboard_updated_at ON dashboard (updated_at)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_weekly_schedule_updated_at ON weekly_schedule (updated_at)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices (created_at)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_dashboard_email ON dashboard (email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_homework_submissions_email ON homework_submissions (email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_registration_subjects ON registration_subjects (role, subject, email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_registration_locations ON registration_locations (role, location, email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_registration_subjects_email ON registration_subjects (email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_registration_locations_email ON registration_locations (email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_tutor_matches_tutor ON tutor_matches (tutor_email)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_weekly_schedule_email ON weekly_schedule (email)")
+
 conn.commit()
 conn.close()
 print("Fresh site.db created successfully with all tables including month and week in weekly_schedule!")
@@ -0,0 +1,262 @@
+// sySTEM@TECH service worker (generated by the /service-worker.js route, version {{ version }})
+//
+// - Static files are precached from a versioned manifest.
+// - Public pages are served stale-while-revalidate.
+// - Portal pages (home, dashboard, weekly schedule) are network-first, with the
+//   last-known copy kept for offline viewing in a cache per user. The server
+//   names the user in the X-Portal-User header, and other users' caches are
+//   deleted as soon as someone else logs in or the user logs out.
+// - Dashboard and schedule saves made offline are queued in IndexedDB and
+//   replayed when the device reconnects, only while the same user is logged in.
+
+const VERSION = {{ version|tojson }};
+const PRECACHE = `precache-${VERSION}`;
+const PUBLIC_CACHE = "public-pages";
+const USER_PAGES_PREFIX = "pages-";
+const META_CACHE = "portal-meta";
+const USER_KEY_URL = "/__portal-user";
+const PRECACHE_MANIFEST = {{ manifest|tojson }};
+const PUBLIC_PAGES = {{ public_pages|tojson }};
+const PORTAL_PAGES = {{ portal_pages|tojson }};
+const QUEUED_WRITES = {{ queued_writes|tojson }};
+const OUTBOX_DB = "systemtech-outbox";
+const OUTBOX_STORE = "requests";
+const SYNC_TAG = "replay-outbox";
+
+self.addEventListener("install", event => {
+  event.waitUntil(
+    caches.open(PRECACHE)
+      .then(cache => cache.addAll(PRECACHE_MANIFEST.map(entry => entry.url)))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", event => {
+  // Drop precaches from older versions (and the old shared pages cache);
+  // per-user page caches are kept for offline viewing
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys
+        .filter(key => (key.startsWith("precache-") && key !== PRECACHE) || key === "pages")
+        .map(key => caches.delete(key))))
+      .then(() => self.clients.claim())
+      .then(replayOutbox)
+  );
+});
+
+self.addEventListener("fetch", event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (request.method === "POST" && QUEUED_WRITES.includes(url.pathname)) {
+    event.respondWith(sendOrQueue(request));
+    return;
+  }
+  if (request.method === "GET" && url.pathname.startsWith("/static/")) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.method === "GET" && PUBLIC_PAGES.includes(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(request, event));
+  } else if (request.method === "GET" && PORTAL_PAGES.includes(url.pathname)) {
+    event.respondWith(networkFirst(request, event));
+  } else if (request.mode === "navigate") {
+    // Other pages (login, logout, ...) go to the network; only note who is logged in
+    event.respondWith(fetch(request).then(response => {
+      event.waitUntil(noteUser(response));
+      return response;
+    }));
+  }
+});
+
+self.addEventListener("sync", event => {
+  if (event.tag === SYNC_TAG) {
+    event.waitUntil(replayOutbox());
+  }
+});
+
+// Pages post "replay-outbox" when the browser comes back online
+// (covers browsers without Background Sync)
+self.addEventListener("message", event => {
+  if (event.data === SYNC_TAG) {
+    event.waitUntil(replayOutbox());
+  }
+});
+
+// ----------------------------------------
+// Caching strategies
+// ----------------------------------------
+async function cacheFirst(request) {
+  const cached = await caches.match(request);
+  if (cached) {
+    return cached;
+  }
+  const response = await fetch(request);
+  if (response.ok) {
+    const cache = await caches.open(PRECACHE);
+    cache.put(request, response.clone());
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(request, event) {
+  const cache = await caches.open(PUBLIC_CACHE);
+  const cached = await cache.match(request);
+  const refresh = fetch(request).then(response => {
+    if (response.ok) {
+      cache.put(request, response.clone());
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(refresh.catch(() => undefined));
+    return cached;
+  }
+  return refresh.catch(() => offlinePage());
+}
+
+async function networkFirst(request, event) {
+  let response;
+  try {
+    response = await fetch(request);
+  } catch (error) {
+    // Offline: only the last logged-in user's own pages are shown
+    const user = await currentUser();
+    const cached = user && await (await caches.open(USER_PAGES_PREFIX + user)).match(request);
+    return cached || offlinePage();
+  }
+  const user = await noteUser(response);
+  // Only keep real pages of a logged-in user, not redirects to the login page
+  if (user && response.ok && !response.redirected) {
+    const cache = await caches.open(USER_PAGES_PREFIX + user);
+    await cache.put(request, response.clone());
+    event.waitUntil(replayOutbox());
+  }
+  return response;
+}
+
+// ----------------------------------------
+// Logged-in user tracking
+// ----------------------------------------
+async function currentUser() {
+  const stored = await (await caches.open(META_CACHE)).match(USER_KEY_URL);
+  return stored ? stored.text() : "";
+}
+
+// Record the user named by a response and delete every other user's pages.
+// Returns the user key, or null if the response does not name one.
+async function noteUser(response) {
+  const user = response.headers.get("X-Portal-User");
+  if (user === null) {
+    return null;
+  }
+  if (user !== await currentUser()) {
+    await (await caches.open(META_CACHE)).put(USER_KEY_URL, new Response(user));
+    const keys = await caches.keys();
+    await Promise.all(keys
+      .filter(key => key.startsWith(USER_PAGES_PREFIX) && key !== USER_PAGES_PREFIX + user)
+      .map(key => caches.delete(key)));
+  }
+  return user;
+}
+
+function offlinePage(message) {
+  const body = `<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Offline</title></head>
+    <body style="font-family: Arial, sans-serif; text-align: center; padding: 40px;">
+    <h2>sySTEM@TECH</h2><p>${message || "You are offline and this page has not been saved yet."}</p>
+    <p><a href="javascript:history.back()">Go back</a></p></body></html>`;
+  return new Response(body, { status: 503, headers: { "Content-Type": "text/html; charset=utf-8" } });
+}
+
+// ----------------------------------------
+// Offline write queue
+// ----------------------------------------
+function openOutbox() {
+  return new Promise((resolve, reject) => {
+    const open = indexedDB.open(OUTBOX_DB, 1);
+    open.onupgradeneeded = () => open.result.createObjectStore(OUTBOX_STORE, { keyPath: "id", autoIncrement: true });
+    open.onsuccess = () => resolve(open.result);
+    open.onerror = () => reject(open.error);
+  });
+}
+
+function outboxRequest(mode, action) {
+  return openOutbox().then(db => new Promise((resolve, reject) => {
+    const tx = db.transaction(OUTBOX_STORE, mode);
+    const result = action(tx.objectStore(OUTBOX_STORE));
+    tx.oncomplete = () => resolve(result.result);
+    tx.onerror = () => reject(tx.error);
+  }));
+}
+
+async function sendOrQueue(request) {
+  const queued = {
+    url: request.url,
+    contentType: request.headers.get("Content-Type"),
+    body: await request.clone().text(),
+    user: await currentUser(),
+    queuedAt: Date.now(),
+  };
+  try {
+    return await fetch(request);
+  } catch (error) {
+    if (!queued.user) {
+      return offlinePage("You are offline and not logged in, so your changes could not be saved.");
+    }
+    await outboxRequest("readwrite", store => store.add(queued));
+    if (self.registration.sync) {
+      await self.registration.sync.register(SYNC_TAG).catch(() => undefined);
+    }
+    return offlinePage("You are offline. Your changes were saved on this device and will be sent when you reconnect.");
+  }
+}
+
+// Tell open pages what happened to a queued save
+async function notifyClients(message) {
+  const windows = await self.clients.matchAll({ type: "window" });
+  windows.forEach(client => client.postMessage({ type: "outbox", ...message }));
+}
+
+let replaying = null;
+
+function replayOutbox() {
+  // One replay at a time, so a queued save is never sent twice
+  if (!replaying) {
+    replaying = sendQueued().finally(() => { replaying = null; });
+  }
+  return replaying;
+}
+
+// Replayed saves carry X-Offline-Replay, so the server answers with a JSON status:
+// 200 saved, 422 invalid (dropped, and the page is told why), 401/409 when the
+// user who made the change is not the one logged in (kept for later).
+async function sendQueued() {
+  const entries = await outboxRequest("readonly", store => store.getAll());
+  for (const entry of entries) {
+    let response;
+    try {
+      const headers = { "X-Offline-Replay": entry.user };
+      if (entry.contentType) {
+        headers["Content-Type"] = entry.contentType;
+      }
+      response = await fetch(entry.url, {
+        method: "POST",
+        headers: headers,
+        body: entry.body,
+        credentials: "same-origin",
+      });
+    } catch (error) {
+      return; // Still offline; try again on the next sync
+    }
+    const result = await response.json().catch(() => ({}));
+    if (response.ok && result.status === "saved") {
+      await outboxRequest("readwrite", store => store.delete(entry.id));
+      await notifyClients({ status: "saved", url: entry.url });
+    } else if (response.status === 422) {
+      await outboxRequest("readwrite", store => store.delete(entry.id));
+      await notifyClients({ status: "invalid", url: entry.url, message: result.message || "" });
+    }
+  }
+}
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Importing app initialises site.db in the working directory, so do it from a scratch directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp())
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Flask app backed by a fresh database and storage folders under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module, "DATABASE", str(tmp_path / "site.db"))
+    monkeypatch.setattr(app_module, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setattr(app_module, "ARCHIVE_FOLDER", str(tmp_path / "archive"))
+    app_module.Database.init_db()
+    app_module.app.config["TESTING"] = True
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(email, role="Student", subjects=("STEM",), locations=("Online",)):
+    """Save a registration (which also creates the user's dashboard and schedule rows)."""
+    app_module.Registration(email, email, "1", "1", "2000", "Other", role, list(subjects), list(locations)).save()
+
+
+def login(client, email):
+    with client.session_transaction() as session:
+        session["username"] = email
@@ -0,0 +1,114 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+
+import app as app_module
+from app import Archive, Dashboard, Invoice, WeeklySchedule
+from conftest import login, register
+
+TOMORROW = (date.today() + timedelta(days=1)).isoformat()
+
+SCHEDULE = {**{day: "" for day in WeeklySchedule.DAYS}, "monday": "VCE Physics", "month": "Mar", "week": "2"}
+
+
+def save_invoice(invoice_no):
+    Invoice("a@x", invoice_no, "", "Client", "c@x", "Co", "Addr", ["Tutoring"], "10", "1", "11", "Cash", "").save()
+
+
+def test_live_rows_survive_archival(app, client):
+    register("a@x")
+    WeeklySchedule("a@x").update_data(SCHEDULE)
+    save_invoice("1")
+
+    report = {entry["table"]: entry for entry in Archive.run(TOMORROW)}
+
+    assert report["weekly_schedule"]["rows_archived"] == report["weekly_schedule"]["rows_verified"] == 1
+    assert report["weekly_schedule"]["rows_deleted"] == 0
+    assert report["invoices"]["rows_deleted"] == report["invoices"]["rows_verified"] == 1
+    assert WeeklySchedule("a@x").get_data()["monday"] == "VCE Physics"
+
+    # The dashboard row is still there for the homework count to update
+    login(client, "a@x")
+    client.post("/homework/submit", data={"homework": (io.BytesIO(b"essay"), "essay.txt")},
+                content_type="multipart/form-data")
+    assert Dashboard("a@x").get_data()["homework_submitted"] == "1"
+
+    conn = app_module.Database.connect()
+    assert conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0] == 0
+    conn.close()
+
+
+def test_history_rows_reads_archives_and_live_rows_once(app):
+    register("a@x")
+    save_invoice("1")
+    Archive.run(TOMORROW)
+    save_invoice("2")
+
+    invoices = Archive.history_rows("invoices", "2000-01-01", "9999-12-31")
+    assert [row[1] for row in invoices] == ["1", "2"]
+    # The live schedule row and its identical snapshot are returned once
+    assert len(Archive.history_rows("weekly_schedule", "2000-01-01", "9999-12-31")) == 1
+
+
+def test_history_rows_handles_more_archives_than_attach_limit(app):
+    register("a@x")
+    for i in range(12):
+        save_invoice(str(i))
+        Archive.run(TOMORROW)
+
+    invoices = Archive.history_rows("invoices", "2000-01-01", "9999-12-31")
+    assert sorted(row[1] for row in invoices) == sorted(str(i) for i in range(12))
+
+
+def test_unchanged_rows_are_snapshotted_once(app):
+    register("a@x")
+    WeeklySchedule("a@x").update_data(SCHEDULE)
+    # Last changed well before this run (a change in the same second as a run is snapshotted again)
+    conn = app_module.Database.connect()
+    conn.execute("UPDATE weekly_schedule SET updated_at = '2001-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+
+    def archived(table):
+        return {entry["table"]: entry for entry in Archive.run(TOMORROW)}[table]["rows_archived"]
+
+    assert archived("weekly_schedule") == 1
+    save_invoice("1")
+    assert archived("weekly_schedule") == 0
+    WeeklySchedule("a@x").update_data({**SCHEDULE, "monday": "Chemistry"})
+    assert archived("weekly_schedule") == 1
+
+    schedules = Archive.history_rows("weekly_schedule", "2000-01-01", "9999-12-31")
+    assert len(schedules) == 2
+    assert {"Chemistry", "VCE Physics"} <= {value for row in schedules for value in row}
+
+
+def test_invoices_stay_when_the_archive_cannot_be_verified(app, monkeypatch):
+    save_invoice("1")
+
+    def disk_full(archive_file):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(Archive, "decompress", staticmethod(disk_full))
+    with pytest.raises(OSError):
+        Archive.run(TOMORROW)
+
+    conn = app_module.Database.connect()
+    assert conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM archive_log").fetchone()[0] == 0
+    conn.close()
+    assert os.listdir(app_module.ARCHIVE_FOLDER) == []
+
+
+def test_concurrent_first_reads_share_the_cache(app):
+    save_invoice("1")
+    archive_file = Archive.run(TOMORROW)[0]["archive_file"]
+    os.remove(Archive.cache_path(archive_file))
+
+    with ThreadPoolExecutor(8) as pool:
+        paths = list(pool.map(Archive.decompress, [archive_file] * 8))
+    assert set(paths) == {Archive.cache_path(archive_file)}
+    assert os.listdir(os.path.dirname(paths[0])) == [os.path.basename(paths[0])]
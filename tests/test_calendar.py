@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import CalendarFeed, WeeklySchedule
+from conftest import login, register
+
+SCHEDULE = {**{day: "" for day in WeeklySchedule.DAYS}, "monday": "Maths", "month": "March", "week": "2"}
+
+
+def this_monday():
+    today = date.today()
+    return today - timedelta(days=today.weekday())
+
+
+@pytest.mark.parametrize("month", ["3", "march", " Mar "])
+def test_week_start(month):
+    start = CalendarFeed.week_start(month, "2")
+    assert start.weekday() == 0 and start.month == 3 and 8 <= start.day <= 14
+
+
+def test_week_start_clamps_week():
+    assert CalendarFeed.week_start("1", "1000000") == CalendarFeed.week_start("1", "10")
+
+
+@pytest.mark.parametrize("month, week", [("²", "1"), ("13", "1"), ("Smarch", "1"), ("3", "0"), ("3", "x"), ("3", None)])
+def test_week_start_falls_back_to_this_week(month, week):
+    assert CalendarFeed.week_start(month, week) == this_monday()
+
+
+def test_fold():
+    assert CalendarFeed.fold("a" * 75) == "a" * 75
+    folded = CalendarFeed.fold("SUMMARY:" + "é" * 80)
+    lines = folded.split("\r\n ")
+    assert all(len(line.encode("utf-8")) <= 75 for line in lines)
+    assert "".join(lines) == "SUMMARY:" + "é" * 80
+
+
+@pytest.mark.parametrize("month, week", [("²", "1"), ("1", "1000000")])
+def test_odd_schedule_values_still_save(client, month, week):
+    register("a@x")
+    login(client, "a@x")
+    form = {**SCHEDULE, "month": month, "week": week}
+    for day in WeeklySchedule.DAYS:
+        form[day] = form[day] or "Free"
+
+    assert client.post("/weekly_schedule", data=form).status_code == 302
+    CalendarFeed("a@x").get_token()
+    assert client.post("/weekly_schedule", data={**form, "monday": "Physics"}).status_code == 302
+    assert WeeklySchedule("a@x").get_data()["monday"] == "Physics"
+
+
+def test_feed_is_served_with_etag(client):
+    register("a@x")
+    WeeklySchedule("a@x").update_data(SCHEDULE)
+    token = CalendarFeed("a@x").get_token()
+
+    response = client.get(f"/calendar/{token}.ics")
+    assert response.status_code == 200
+    assert "SUMMARY:Maths" in response.get_data(as_text=True)
+
+    again = client.get(f"/calendar/{token}.ics", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+    WeeklySchedule("a@x").update_data({**SCHEDULE, "monday": "Physics"})
+    changed = client.get(f"/calendar/{token}.ics", headers={"If-None-Match": response.headers["ETag"]})
+    assert changed.status_code == 200 and "SUMMARY:Physics" in changed.get_data(as_text=True)
+
+    assert client.get("/calendar/nope.ics").status_code == 404
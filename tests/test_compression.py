@@ -0,0 +1,69 @@
+import gzip
+import os
+
+import pytest
+
+from conftest import register
+
+SCRIPT = b"console.log('sySTEM@TECH');\n" * 200
+
+
+@pytest.fixture
+def static_dir(app, tmp_path, monkeypatch):
+    """A static folder holding app.js and its precompressed .gz sibling."""
+    folder = tmp_path / "static"
+    folder.mkdir()
+    (folder / "app.js").write_bytes(SCRIPT)
+    (folder / "app.js.gz").write_bytes(gzip.compress(SCRIPT))
+    monkeypatch.setattr(app, "static_folder", str(folder))
+    return folder
+
+
+def test_static_sibling_is_negotiated(client, static_dir):
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.data) == SCRIPT
+    response.close()
+
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+    assert response.data == SCRIPT
+    response.close()
+
+
+def test_stale_static_sibling_is_ignored(client, static_dir):
+    edited = b"console.log('edited');\n"
+    source = static_dir / "app.js"
+    source.write_bytes(edited)
+    newer = os.path.getmtime(static_dir / "app.js.gz") + 10
+    os.utime(source, (newer, newer))
+
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == edited
+    response.close()
+
+
+def test_dynamic_etag_is_per_encoding(client):
+    plain = client.get("/service-worker.js", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/service-worker.js", headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.vary
+    assert compressed.get_etag()[0] == plain.get_etag()[0] + "-gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+
+    again = client.get("/service-worker.js", headers={"Accept-Encoding": "gzip",
+                                                      "If-None-Match": compressed.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_streamed_page_is_compressed(client):
+    register("a@x")
+    response = client.get("/view_database", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert b"a@x" in gzip.decompress(response.data)
@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from app import Dashboard, EventBus
+from conftest import login, register
+
+
+@pytest.fixture(autouse=True)
+def fast_poller(monkeypatch):
+    """Poll quickly, and let each test's poller exit before the next test's database is used."""
+    yield
+    thread = EventBus._thread
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def test_events_require_login_for_every_scope(client):
+    assert client.get("/events").status_code == 401
+    assert client.get("/events?scope=all").status_code == 401
+
+
+def test_events_stream_only_own_changes(client):
+    register("a@x")
+    login(client, "a@x")
+
+    response = client.get("/events", buffered=False)
+    chunks = iter(response.response)
+    next(chunks)  # retry: line
+    register("b@x")
+    Dashboard("a@x").update_data({field: "1" for field in Dashboard.FIELDS})
+
+    event = next(chunks).decode()
+    assert "event: dashboard" in event and '"a@x"' in event
+    response.close()
+
+
+def test_poller_survives_database_errors(client, monkeypatch):
+    since = EventBus.since
+    failures = iter([sqlite3.OperationalError("database is locked")])
+
+    def flaky_since(last_id):
+        error = next(failures, None)
+        if error:
+            raise error
+        return since(last_id)
+
+    monkeypatch.setattr(EventBus, "since", staticmethod(flaky_since))
+    register("a@x")
+    login(client, "a@x")
+
+    response = client.get("/events", buffered=False)
+    chunks = iter(response.response)
+    next(chunks)  # retry: line
+    Dashboard("a@x").update_data({field: "1" for field in Dashboard.FIELDS})
+
+    assert "event: dashboard" in next(chunks).decode()
+    response.close()
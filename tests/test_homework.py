@@ -0,0 +1,96 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from app import HomeworkStore
+from conftest import login, register
+
+
+@pytest.fixture
+def student(client):
+    register("a@x")
+    login(client, "a@x")
+    return client
+
+
+@pytest.mark.parametrize("body", [{"filename": "a.pdf", "size": [1]}, {"filename": "a.pdf", "size": None}, [], "x"])
+def test_upload_start_rejects_malformed_json(student, body):
+    assert student.post("/homework/uploads", json=body).status_code == 400
+
+
+def test_upload_size_limit(student, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_UPLOAD_SIZE", 10)
+    response = student.post("/homework/uploads", json={"filename": "a.pdf", "size": 11})
+    assert response.status_code == 413
+
+    student.post("/homework/submit", data={"homework": (io.BytesIO(b"x" * 11), "a.pdf")},
+                 content_type="multipart/form-data")
+    assert HomeworkStore.list_submissions("a@x") == []
+
+
+def test_resumable_upload_and_dedup(student):
+    data = b"homework" * 1000
+    upload_id = student.post("/homework/uploads", json={"filename": "a.pdf", "size": len(data)}).json["upload_id"]
+    response = student.put(f"/homework/uploads/{upload_id}", data=data[:100],
+                           headers={"Content-Range": f"bytes 0-99/{len(data)}"})
+    assert response.json["received"] == 100
+    response = student.put(f"/homework/uploads/{upload_id}", data=data[100:],
+                           headers={"Content-Range": f"bytes 100-{len(data) - 1}/{len(data)}"})
+    assert response.status_code == 201
+
+    student.post("/homework/submit", data={"homework": (io.BytesIO(data), "copy.pdf")},
+                 content_type="multipart/form-data")
+    assert len(HomeworkStore.list_submissions("a@x")) == 2
+    assert sum(len(files) for _, _, files in os.walk(os.path.join(app_module.UPLOAD_FOLDER, "objects"))) == 1
+
+
+def test_stale_uploads_are_removed(student):
+    upload_id = student.post("/homework/uploads", json={"filename": "a.pdf", "size": 100}).json["upload_id"]
+    path = HomeworkStore.partial_path(upload_id)
+    old = time.time() - HomeworkStore.STALE_AFTER.total_seconds() - 60
+    os.utime(path, (old, old))
+
+    assert HomeworkStore.cleanup_stale_uploads() == 1
+    assert not os.path.exists(path)
+    assert HomeworkStore.get_upload(upload_id, "a@x") is None
+
+
+def test_retried_final_chunk_is_claimed_once(student):
+    data = b"homework" * 100
+    upload_id = student.post("/homework/uploads", json={"filename": "a.pdf", "size": len(data)}).json["upload_id"]
+    reading = threading.Event()
+    release = threading.Event()
+
+    class SlowStream(io.BytesIO):
+        def read(self, size=-1):
+            reading.set()
+            release.wait(5)
+            return super().read(size)
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(
+        HomeworkStore.append_chunk(upload_id, "a@x", 0, len(data), SlowStream(data))))
+    first.start()
+    reading.wait(5)
+
+    # The retry arrives while the first attempt is still writing
+    with pytest.raises(ValueError):
+        HomeworkStore.append_chunk(upload_id, "a@x", 0, len(data), io.BytesIO(data))
+    release.set()
+    first.join(5)
+
+    assert results[0][0] == len(data) and results[0][1] is not None
+    assert len(HomeworkStore.list_submissions("a@x")) == 1
+
+
+def test_short_chunk_releases_its_claim(student):
+    data = b"homework" * 100
+    upload_id = student.post("/homework/uploads", json={"filename": "a.pdf", "size": len(data)}).json["upload_id"]
+
+    assert HomeworkStore.append_chunk(upload_id, "a@x", 0, 100, io.BytesIO(data[:40])) == (40, None)
+    assert HomeworkStore.get_upload(upload_id, "a@x")["received"] == 40
+    assert HomeworkStore.append_chunk(upload_id, "a@x", 40, len(data) - 40, io.BytesIO(data[40:]))[1] is not None
@@ -0,0 +1,30 @@
+from app import TutorMatcher
+from conftest import login, register
+
+
+def test_students_can_only_match_themselves(client):
+    register("s@x")
+    register("other@x")
+    register("t@x", role="Tutor")
+    login(client, "s@x")
+
+    assert client.get("/match").status_code == 200
+    assert client.get("/match?email=other@x").status_code == 403
+    assert client.post("/match?email=other@x").status_code == 403
+    assert client.post("/match/batch").status_code == 403
+
+    login(client, "t@x")
+    assert client.get("/match?email=other@x").status_code == 200
+    assert client.post("/match/batch").json == {"assigned": 2}
+
+
+def test_reassigning_ignores_the_students_own_match(app):
+    register("s@x", subjects=["STEM"])
+    register("t1@x", role="Tutor", subjects=["STEM"])
+    register("t2@x", role="Tutor", subjects=["STEM", "Calligraphy"])
+
+    first = TutorMatcher.assign("s@x")
+    again = TutorMatcher.assign("s@x")
+
+    assert again["tutor"] == first["tutor"]
+    assert again["load"] == 0
@@ -0,0 +1,40 @@
+from app import ServiceWorker, WeeklySchedule
+from conftest import login, register
+
+FORM = {**{day: "Maths" for day in WeeklySchedule.DAYS}, "month": "May", "week": "1"}
+
+
+def replay(client, key, form=FORM):
+    return client.post("/weekly_schedule", data=form, headers={"X-Offline-Replay": key})
+
+
+def test_replayed_saves_get_a_status(client):
+    register("a@x")
+    register("b@x")
+    key = ServiceWorker.user_key("a@x")
+
+    assert replay(client, key).status_code == 401
+
+    login(client, "b@x")
+    assert replay(client, key).json == {"status": "different-user"}
+    assert WeeklySchedule("a@x").get_data()["month"] == ""
+
+    login(client, "a@x")
+    response = replay(client, key, {**FORM, "month": ""})
+    assert response.status_code == 422 and response.json["status"] == "invalid"
+
+    response = replay(client, key)
+    assert response.status_code == 200 and response.json == {"status": "saved"}
+    assert WeeklySchedule("a@x").get_data()["month"] == "May"
+
+
+def test_form_posts_still_redirect_and_pages_name_the_user(client):
+    register("a@x")
+    login(client, "a@x")
+
+    response = client.post("/weekly_schedule", data=FORM)
+    assert response.status_code == 302
+    assert response.headers["X-Portal-User"] == ServiceWorker.user_key("a@x")
+
+    # Only HTML is tagged
+    assert "X-Portal-User" not in client.get("/service-worker.js").headers